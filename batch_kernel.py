@@ -0,0 +1,182 @@
+# Experiment kernel that works on a whole batch of small graphs at once.
+#
+# A batch of N graphs on n nodes (n <= 11) is a uint64 array of N edge words:
+# bit k of a word is set when pair k is an edge, with pairs numbered as in
+# edge_sampling.py ((0,1), (0,2), (1,2), (0,3), ...). Everything below works
+# on the whole array with NumPy bit operations, looping only over nodes,
+# pairs or node subsets, never over graphs, and returns one value per graph.
+#
+# approx1 breaks ties towards the lowest node like graph.approx1, and
+# approx2/approx3 follow the same rules as graph.approx2/approx3 with their
+# random orders drawn from a NumPy Generator, so the sizes have the same
+# distributions as the Graph versions.
+import numpy as np
+from edge_sampling import number_of_pairs, pair_from_index
+
+MAX_NODES = 11  # 11 * 10 / 2 = 55 pairs, the most that fit in a word
+BATCH = 1 << 16  # graphs generated at a time, bounds the temporary arrays
+
+_ONE = np.uint64(1)
+
+
+def _pair_ends(n):
+    ends = np.array([pair_from_index(k) for k in range(number_of_pairs(n))], dtype=np.uint64)
+    return ends.reshape(-1, 2)
+
+
+def _check(n):
+    if not 0 < n <= MAX_NODES:
+        raise ValueError(f"batch graphs need 1 <= n <= {MAX_NODES}, got {n}")
+
+
+# count uniform random graphs with n nodes and m edges
+def random_batch(n, m, count, rng):
+    _check(n)
+    total = number_of_pairs(n)
+    m = max(0, min(m, total))
+    words = np.zeros(count, dtype=np.uint64)
+    if m == 0:
+        return words
+    bits = _ONE << np.arange(total, dtype=np.uint64)
+    for start in range(0, count, BATCH):
+        size = min(BATCH, count - start)
+        # the m smallest of total random keys are a uniform m-subset of the pairs
+        chosen = np.argpartition(rng.random((size, total)), m - 1, axis=1)[:, :m]
+        words[start:start + size] = np.bitwise_or.reduce(bits[chosen], axis=1)
+    return words
+
+
+def edge_counts(words):
+    return np.bitwise_count(words).astype(np.int64)
+
+
+# (N, n) array of neighbour masks, row[:, v] = neighbours of v
+def adjacency_rows(words, n):
+    rows = np.zeros((len(words), n), dtype=np.uint64)
+    for k, (u, v) in enumerate(_pair_ends(n)):
+        present = words >> np.uint64(k) & _ONE
+        rows[:, u] |= present << v
+        rows[:, v] |= present << u
+    return rows
+
+
+def _covered_pairs(n, both=False):
+    # covered[S] = word of the pairs with an endpoint in node subset S (both
+    # endpoints with both=True)
+    subsets = np.arange(1 << n, dtype=np.uint64)
+    covered = np.zeros(1 << n, dtype=np.uint64)
+    for k, (u, v) in enumerate(_pair_ends(n)):
+        if both:
+            touches = subsets >> u & subsets >> v & _ONE
+        else:
+            touches = (subsets >> u | subsets >> v) & _ONE
+        covered |= touches << np.uint64(k)
+    return covered
+
+
+def _first_size(words, n, order, fits):
+    # the first subset size in order that has a subset S with
+    # words & fits[S] == 0, for every graph
+    subset_sizes = np.bitwise_count(np.arange(1 << n, dtype=np.uint64))
+    sizes = np.zeros(len(words), dtype=np.int64)
+    pending = np.arange(len(words))
+    for size in order:
+        if not len(pending):
+            break
+        w = words[pending]
+        hit = np.zeros(len(pending), dtype=bool)
+        for S in np.flatnonzero(subset_sizes == size):
+            hit |= (w & fits[S]) == 0
+        sizes[pending[hit]] = size
+        pending = pending[~hit]
+    return sizes
+
+
+# Exact, by trying node subsets smallest first (largest first for MIS)
+def mvc_sizes(words, n):
+    _check(n)
+    return _first_size(words, n, range(n + 1), ~_covered_pairs(n))
+
+
+def mis_sizes(words, n):
+    _check(n)
+    return _first_size(words, n, range(n, -1, -1), _covered_pairs(n, both=True))
+
+
+def approx1_sizes(words, n):
+    rows = adjacency_rows(words, n)
+    sizes = np.zeros(len(words), dtype=np.int64)
+    everyone = np.arange(len(words))
+    for _ in range(n):
+        degree = np.bitwise_count(rows)
+        best = np.argmax(degree, axis=1)  # first maximum, the lowest node
+        active = degree[everyone, best] > 0
+        if not active.any():
+            break
+        sizes += active
+        keep = ~(_ONE << best.astype(np.uint64))
+        rows &= keep[:, None]
+        rows[everyone, best] = 0
+    return sizes
+
+
+def approx2_sizes(words, n, rng):
+    # nodes in random order, taken until they cover every edge (at least one
+    # is always taken, as in graph.approx2)
+    missed = ~_covered_pairs(n)
+    order = np.argsort(rng.random((len(words), n)), axis=1).astype(np.uint64)
+    cover = np.zeros(len(words), dtype=np.uint64)
+    sizes = np.zeros(len(words), dtype=np.int64)
+    done = np.zeros(len(words), dtype=bool)
+    for t in range(n):
+        cover |= _ONE << order[:, t]
+        covered = (words & missed[cover]) == 0
+        sizes[covered & ~done] = t + 1
+        done |= covered
+    return sizes
+
+
+def approx3_sizes(words, n, rng):
+    # edges in random order, both ends of every edge still uncovered
+    ends = _pair_ends(n)
+    total = len(ends)
+    order = np.argsort(rng.random((len(words), total)), axis=1).astype(np.uint64)
+    cover = np.zeros(len(words), dtype=np.uint64)
+    for t in range(total):
+        k = order[:, t]
+        u = ends[:, 0][k]
+        v = ends[:, 1][k]
+        take = (words >> k & _ONE).astype(bool) & ((cover >> u | cover >> v) & _ONE == 0)
+        cover |= np.where(take, _ONE << u | _ONE << v, np.uint64(0))
+    return np.bitwise_count(cover).astype(np.int64)
+
+
+def component_counts(words, n):
+    rows = adjacency_rows(words, n)
+    remaining = np.full(len(words), (1 << n) - 1, dtype=np.uint64)
+    counts = np.zeros(len(words), dtype=np.int64)
+    for _ in range(n):
+        left = remaining != 0
+        if not left.any():
+            break
+        counts += left
+        # flood from the lowest remaining node
+        reach = remaining & (~remaining + _ONE)
+        for _ in range(n - 1):
+            grown = reach.copy()
+            for v in range(n):
+                grown |= np.where(reach >> np.uint64(v) & _ONE, rows[:, v], np.uint64(0))
+            if (grown == reach).all():
+                break
+            reach = grown
+        remaining &= ~reach
+    return counts
+
+
+def connected_flags(words, n):
+    return component_counts(words, n) == 1
+
+
+def cycle_flags(words, n):
+    # a forest on n nodes with c components has exactly n - c edges
+    return edge_counts(words) > n - component_counts(words, n)
@@ -0,0 +1,67 @@
+# Compares BFS2 against bidirectional_BFS on random graphs of growing size and
+# density: average time per query and average number of nodes expanded.
+import argparse
+import random
+import time
+from graph import BFS2, bidirectional_BFS, create_random_graph
+
+
+# Wraps G.adj and counts how many adjacency lists a search reads, i.e. how
+# many nodes it expands
+class CountingGraph:
+
+    def __init__(self, G):
+        self.G = G
+        self.expanded = 0
+        self.adj = self
+
+    def __getitem__(self, node):
+        self.expanded += 1
+        return self.G.adj[node]
+
+    def get_size(self):
+        return self.G.get_size()
+
+
+def measure(search, G, pairs):
+    counted = CountingGraph(G)
+    start = time.perf_counter()
+    lengths = [len(search(counted, a, b)) for a, b in pairs]
+    elapsed = time.perf_counter() - start
+    return lengths, elapsed / len(pairs), counted.expanded / len(pairs)
+
+
+def run_benchmark(sizes, degrees, queries, seed=0):
+    rng = random.Random(seed)
+    rows = []
+    for n in sizes:
+        for degree in degrees:
+            G = create_random_graph(n, n * degree // 2, rng=rng)
+            pairs = [(rng.randrange(n), rng.randrange(n)) for _ in range(queries)]
+            one_lengths, one_time, one_expanded = measure(BFS2, G, pairs)
+            two_lengths, two_time, two_expanded = measure(bidirectional_BFS, G, pairs)
+            assert one_lengths == two_lengths, "bidirectional search found a different path length"
+            rows.append({
+                'nodes': n,
+                'avg_degree': degree,
+                'bfs2_ms': one_time * 1000,
+                'bidir_ms': two_time * 1000,
+                'bfs2_expanded': one_expanded,
+                'bidir_expanded': two_expanded,
+            })
+            print(f"n={n:>8}  deg={degree:>2}  "
+                  f"BFS2 {one_time * 1000:9.3f} ms {one_expanded:11.1f} nodes  |  "
+                  f"bidir {two_time * 1000:9.3f} ms {two_expanded:9.1f} nodes  "
+                  f"({one_expanded / max(two_expanded, 1):.0f}x fewer)")
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--degrees", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run_benchmark(args.sizes, args.degrees, args.queries, args.seed)
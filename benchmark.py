@@ -0,0 +1,184 @@
+# Benchmarks the algorithms in graph.py over a grid of graph sizes and edge
+# densities (fraction of the n(n-1)/2 possible edges) and writes the timings
+# as JSON.
+#
+#   python benchmark.py --out bench.json
+#   python benchmark.py --baseline bench.json --out new.json
+#
+# With --baseline every case is compared against the same (name, n, density)
+# entry of an earlier run, and any whose best time grew by more than
+# --threshold is reported as a regression (exit status 1).
+import argparse
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from graph import (Graph, BFS, BFS2, BFS3, DFS, DFS2, DFS3, has_cycle, is_connected,
+                   create_random_graph, MVC, MIS, approx1, approx2, approx3)
+from edge_sampling import sample_edges
+
+QUERIES = 20   # source/target pairs per BFS/DFS case
+EXACT_MAX_NODES = 60   # MVC/MIS are exponential, skip them on larger graphs
+
+
+def _graph_and_pairs(n, m, rng):
+    G = create_random_graph(n, m, rng=rng)
+    return G, [(rng.randrange(n), rng.randrange(n)) for _ in range(QUERIES)]
+
+
+# Each setup builds its input from rng and returns the zero-argument call
+# that gets timed, so graph generation is not part of the measurement
+# (except for the two cases that measure it).
+def bench_create_random_graph(n, m, rng):
+    return lambda: create_random_graph(n, m)
+
+
+def bench_add_edge(n, m, rng):
+    edges = sample_edges(n, m, rng)
+
+    def build():
+        G = Graph(n)
+        for u, v in edges:
+            G.add_edge(u, v)
+    return build
+
+
+def bench_search(search):
+    def setup(n, m, rng):
+        G, pairs = _graph_and_pairs(n, m, rng)
+        return lambda: [search(G, a, b) for a, b in pairs]
+    return setup
+
+
+def bench_traversal(search):
+    def setup(n, m, rng):
+        G, pairs = _graph_and_pairs(n, m, rng)
+        return lambda: [search(G, a) for a, _ in pairs]
+    return setup
+
+
+def bench_whole_graph(algorithm, randomized=False):
+    def setup(n, m, rng):
+        G = create_random_graph(n, m, rng=rng)
+        if randomized:
+            return lambda: algorithm(G, rng)
+        return lambda: algorithm(G)
+    return setup
+
+
+# name -> (setup, exact); exact cases only run up to EXACT_MAX_NODES
+CASES = {
+    'create_random_graph': (bench_create_random_graph, False),
+    'add_edge': (bench_add_edge, False),
+    'BFS': (bench_search(BFS), False),
+    'BFS2': (bench_search(BFS2), False),
+    'BFS3': (bench_traversal(BFS3), False),
+    'DFS': (bench_search(DFS), False),
+    'DFS2': (bench_search(DFS2), False),
+    'DFS3': (bench_traversal(DFS3), False),
+    'has_cycle': (bench_whole_graph(has_cycle), False),
+    'is_connected': (bench_whole_graph(is_connected), False),
+    'MVC': (bench_whole_graph(MVC), True),
+    'MIS': (bench_whole_graph(MIS), True),
+    'approx1': (bench_whole_graph(approx1), False),
+    'approx2': (bench_whole_graph(approx2, randomized=True), False),
+    'approx3': (bench_whole_graph(approx3, randomized=True), False),
+}
+
+
+def time_call(call, repeats, min_time=0.05):
+    # runs call in loops long enough to time reliably; seconds per call
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            call()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or loops >= 1 << 20:
+            break
+        loops *= 2
+    samples = [elapsed / loops]
+    for _ in range(repeats - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            call()
+        samples.append((time.perf_counter() - start) / loops)
+    return samples, loops
+
+
+def run_benchmarks(names, sizes, densities, repeats=5, seed=0):
+    rows = []
+    for name in names:
+        setup, exact = CASES[name]
+        for n in sizes:
+            if exact and n > EXACT_MAX_NODES:
+                continue
+            for density in densities:
+                m = round(density * n * (n - 1) / 2)
+                rng = random.Random(f"{seed}/{name}/{n}/{density}")
+                samples, loops = time_call(setup(n, m, rng), repeats)
+                rows.append({
+                    'name': name,
+                    'n': n,
+                    'density': density,
+                    'edges': m,
+                    'best_s': min(samples),
+                    'median_s': statistics.median(samples),
+                    'loops': loops,
+                    'repeats': repeats,
+                })
+                print(f"{name:>20}  n={n:>6}  density={density:<6}  "
+                      f"best {min(samples) * 1000:10.4f} ms  median {statistics.median(samples) * 1000:10.4f} ms")
+    return rows
+
+
+def compare(rows, baseline, threshold=0.10):
+    # (row, baseline row, ratio) for every case slower than baseline by more than threshold
+    old = {(r['name'], r['n'], r['density']): r for r in baseline['results']}
+    regressions = []
+    for row in rows:
+        before = old.get((row['name'], row['n'], row['density']))
+        if before is None:
+            continue
+        ratio = row['best_s'] / before['best_s']
+        if ratio > 1 + threshold:
+            regressions.append((row, before, ratio))
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cases", nargs="+", default=list(CASES), choices=list(CASES))
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50, 200, 1000])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.01, 0.05, 0.2])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file from an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown (as a fraction of the baseline time) counted as a regression")
+    args = parser.parse_args()
+
+    rows = run_benchmarks(args.cases, args.sizes, args.densities, args.repeats, args.seed)
+    report = {
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'seed': args.seed,
+        'results': rows,
+    }
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(rows, baseline, args.threshold)
+        for row, before, ratio in regressions:
+            print(f"REGRESSION {row['name']} n={row['n']} density={row['density']}: "
+                  f"{before['best_s'] * 1000:.4f} ms -> {row['best_s'] * 1000:.4f} ms ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions beyond {args.threshold:.0%}")
@@ -0,0 +1,113 @@
+# Batched BFS queries against one unchanging graph.
+#
+# Queries are grouped by source and every target of a source is answered
+# from a single traversal, which stops as soon as the last of them is found.
+# The visited buffer is allocated once: each traversal bumps a generation
+# counter and a node counts as visited only if its stamp equals the current
+# generation, so nothing is cleared or reallocated between queries.
+#
+# mode="bitset" runs level-synchronous BFS on Python int bitmasks instead
+# (the whole frontier is expanded at once with ORs of neighbour masks),
+# which is faster on dense graphs.
+#
+# For plain reachability in an undirected graph that never changes,
+# graph.connected_components answers every pair in O(1) after one pass;
+# this is for when hop distances are wanted too, or only a few sources.
+from array import array
+from collections import deque
+from bitset import adjacency_masks, iter_bits
+
+
+class BatchBFS:
+
+    def __init__(self, G, mode="queue"):
+        if mode not in ("queue", "bitset"):
+            raise ValueError(f"unknown BFS mode {mode!r}")
+        self.G = G
+        self.mode = mode
+        n = G.get_size()
+        self.stamp = array("L", [0]) * n
+        self.dist = array("l", [0]) * n
+        self.generation = 0
+        self.masks = adjacency_masks(G) if mode == "bitset" else None
+
+    # Hop distance for each (source, target) pair, -1 if unreachable, in
+    # the order the pairs were given
+    def distances(self, pairs):
+        pairs = list(pairs)
+        by_source = {}
+        for k, (source, target) in enumerate(pairs):
+            by_source.setdefault(source, []).append(k)
+
+        answers = [-1] * len(pairs)
+        for source, ks in by_source.items():
+            targets = {pairs[k][1] for k in ks}
+            if self.mode == "bitset":
+                found = self._bitset_levels(source, targets)
+            else:
+                found = self._queue_levels(source, targets)
+            for k in ks:
+                answers[k] = found.get(pairs[k][1], -1)
+        return answers
+
+    # True/False for each (source, target) pair
+    def reachable(self, pairs):
+        return [d >= 0 for d in self.distances(pairs)]
+
+    def _queue_levels(self, source, targets):
+        self.generation += 1
+        gen = self.generation
+        stamp = self.stamp
+        dist = self.dist
+        adj = self.G.adj
+
+        found = {}
+        stamp[source] = gen
+        dist[source] = 0
+        if source in targets:
+            found[source] = 0
+            if len(found) == len(targets):
+                return found
+        Q = deque([source])
+        while Q:
+            u = Q.popleft()
+            d = dist[u] + 1
+            for v in adj[u]:
+                if stamp[v] != gen:
+                    stamp[v] = gen
+                    dist[v] = d
+                    if v in targets:
+                        found[v] = d
+                        if len(found) == len(targets):
+                            return found
+                    Q.append(v)
+        return found
+
+    def _bitset_levels(self, source, targets):
+        masks = self.masks
+        wanted = 0
+        for t in targets:
+            wanted |= 1 << t
+
+        found = {}
+        visited = frontier = 1 << source
+        level = 0
+        while frontier:
+            hit = frontier & wanted
+            if hit:
+                for t in iter_bits(hit):
+                    found[t] = level
+                wanted &= ~hit
+                if not wanted:
+                    break
+            reach = 0
+            for u in iter_bits(frontier):
+                reach |= masks[u]
+            frontier = reach & ~visited
+            visited |= frontier
+            level += 1
+        return found
+
+
+def batch_reachable(G, pairs, mode="queue"):
+    return BatchBFS(G, mode).reachable(pairs)
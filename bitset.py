@@ -0,0 +1,34 @@
+# Small helpers for working with vertex sets as Python int bitmasks.
+# Bit v of a mask is set when node v is in the set.
+
+
+def popcount(mask):
+    return bin(mask).count("1")
+
+
+def iter_bits(mask):
+    # yields the node index of every set bit, lowest first
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def mask_of(nodes):
+    mask = 0
+    for v in nodes:
+        mask |= 1 << v
+    return mask
+
+
+def nodes_of(mask):
+    return list(iter_bits(mask))
+
+
+def adjacency_masks(G):
+    # adj[u] is the bitmask of neighbours of u (nodes are 0..n-1)
+    adj = [0] * G.get_size()
+    for u in G.adj:
+        for v in G.adj[u]:
+            adj[u] |= 1 << v
+    return adj
@@ -0,0 +1,53 @@
+# Checks thousands of candidate vertex covers / independent sets against one
+# graph at once with NumPy.
+#
+# Candidates are rows of a boolean matrix (candidates[k, v] is True when node
+# v is in candidate k); a list of int bitmasks or of node collections is
+# converted first. Each check then looks at both ends of every edge for all
+# candidates together, O(k * m) work done in a few array operations.
+import numpy as np
+
+
+def edge_array(G):
+    # (m, 2) array of the edges of G, each once (self loops included)
+    edges = [(u, v) for u in G.adj for v in G.adj[u] if u <= v]
+    return np.array(edges, dtype=np.intp).reshape(-1, 2)
+
+
+def candidate_matrix(candidates, n):
+    if hasattr(candidates, "dtype"):
+        matrix = np.asarray(candidates, dtype=bool)
+        return matrix.reshape(-1, n)
+    candidates = list(candidates)
+    if candidates and all(isinstance(c, int) for c in candidates):
+        if n <= 63:
+            words = np.array(candidates, dtype=np.uint64)
+            bits = np.arange(n, dtype=np.uint64)
+            return (words[:, None] >> bits & np.uint64(1)).astype(bool)
+        matrix = np.zeros((len(candidates), n), dtype=bool)
+        for k, mask in enumerate(candidates):
+            bits = np.frombuffer(mask.to_bytes((n + 7) // 8, "little"), dtype=np.uint8)
+            matrix[k] = np.unpackbits(bits, bitorder="little")[:n]
+        return matrix
+    matrix = np.zeros((len(candidates), n), dtype=bool)
+    for k, nodes in enumerate(candidates):
+        matrix[k, list(nodes)] = True
+    return matrix
+
+
+# One True/False per candidate, in the order given. Pass edges=edge_array(G)
+# when checking several batches against the same graph.
+def vertex_cover_batch(G, candidates, edges=None):
+    n = G.get_size()
+    matrix = candidate_matrix(candidates, n)
+    if edges is None:
+        edges = edge_array(G)
+    return (matrix[:, edges[:, 0]] | matrix[:, edges[:, 1]]).all(axis=1)
+
+
+def independent_set_batch(G, candidates, edges=None):
+    n = G.get_size()
+    matrix = candidate_matrix(candidates, n)
+    if edges is None:
+        edges = edge_array(G)
+    return ~(matrix[:, edges[:, 0]] & matrix[:, edges[:, 1]]).any(axis=1)
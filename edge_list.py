@@ -0,0 +1,232 @@
+# Reads edge list files (one "u v" pair per line, whitespace or comma
+# separated, optionally gzipped) straight into a CSRGraph.
+#
+# The file is read in fixed-size byte blocks cut at the last newline, and
+# numpy.loadtxt parses each block straight into an array, so no line ever
+# becomes a Python object. Numeric names that fit are kept as int32 from the
+# start. Node names can be anything (numbers or strings): they are relabeled
+# to 0..n-1 in sorted order by a binary search into the sorted distinct
+# names, each chunk turning into int32 node numbers as soon as the names are
+# known. The CSR arrays are then built in two passes over the chunks,
+# counting degrees and then placing every chunk's endpoints at their row
+# offsets, dropping each chunk as soon as it is placed.
+#
+# Peak memory is the int32 endpoints of every edge twice over (the chunks,
+# then the CSR indices they are placed into), a few int64 arrays of length n
+# and one chunk's temporaries: about three times the final graph for numeric
+# files (3M edges: 34 MB of CSR and labels, about 100 MB peak). String names
+# are held as parsed text until relabeled.
+#
+# Repeated edges (including the same edge listed as "u v" and "v u") are
+# kept once, and rows come out sorted. As in Graph, a self loop appears twice
+# in its node's row.
+#
+#   python edge_list.py web-Google.txt.gz --out google.bin
+import argparse
+import gzip
+import io
+import time
+import warnings
+import numpy as np
+from graph import CSRGraph
+
+CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def _open(path):
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _blocks(f, chunk_bytes):
+    # about chunk_bytes at a time, always ending at a line break
+    rest = b""
+    while True:
+        data = f.read(chunk_bytes)
+        if not data:
+            if rest:
+                yield rest
+            return
+        data = rest + data
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            rest = data  # no line break yet, read more
+            continue
+        rest = data[cut:]
+        yield data[:cut]
+
+
+# Yields an (m, 2) array for every block of lines (int32 if every name in it
+# fits, else int64; str with numeric=False); lines starting with comments and
+# columns after the second are ignored
+def iter_edge_chunks(path, delimiter=None, comments="#", numeric=True, header=False,
+                     chunk_bytes=CHUNK_BYTES):
+    if delimiter is None and ".csv" in str(path):
+        delimiter = ","
+    dtype = np.int64 if numeric else str
+    with _open(path) as f:
+        if header:
+            f.readline()
+        for block in _blocks(f, chunk_bytes):
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")  # blocks with only comments
+                # on bytes, loadtxt decodes a little at a time; a StringIO
+                # would hold the whole block as 4 byte characters
+                pairs = np.loadtxt(io.BytesIO(block), dtype=dtype, delimiter=delimiter,
+                                   comments=comments, usecols=(0, 1), ndmin=2)
+            del block
+            if numeric and len(pairs) and -2 ** 31 <= pairs.min() and pairs.max() < 2 ** 31:
+                pairs = pairs.astype(np.int32)
+            if len(pairs):
+                yield pairs
+
+
+# Returns (G, labels, stats): G is a CSRGraph, labels[i] is the name node i
+# had in the file, and stats has the edge and node counts, the time taken and
+# the throughput in edges read per second. numeric=False reads node names as
+# strings. relabel=False uses numeric names as node numbers directly (nodes
+# 0..max name, unlisted ones isolated).
+def read_edge_list(path, delimiter=None, comments="#", numeric=True, header=False,
+                   relabel=True, chunk_bytes=CHUNK_BYTES):
+    if not relabel and not numeric:
+        raise ValueError("relabel=False needs numeric node names")
+    start = time.perf_counter()
+    chunks = list(iter_edge_chunks(path, delimiter, comments, numeric, header, chunk_bytes))
+    parsed = time.perf_counter()
+    edges_read = sum(len(c) for c in chunks)
+
+    if relabel:
+        labels = _all_labels(chunks)
+        n = len(labels)
+    else:
+        n = int(max((c.max() for c in chunks), default=-1)) + 1
+        if chunks and min(c.min() for c in chunks) < 0:
+            raise ValueError("negative node numbers need relabel=True")
+        labels = np.arange(n)
+    typecode = np.int32 if n < 2 ** 31 else np.int64
+
+    # pass 1: turn the names in every chunk into node numbers, count degrees
+    degree = np.zeros(n, dtype=np.int64)
+    for k, pairs in enumerate(chunks):
+        ids = _relabel(labels, pairs, typecode) if relabel else pairs.astype(typecode)
+        chunks[k] = ids
+        degree += np.bincount(ids.ravel(), minlength=n)
+
+    # pass 2: place both directions of every edge at the next free slot of
+    # its row; slots within a chunk go by rank among equal rows
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(degree, out=indptr[1:])
+    del degree
+    fill = indptr[:-1].copy()
+    indices = np.empty(indptr[-1], dtype=typecode)
+    chunks.reverse()
+    while chunks:
+        pairs = chunks.pop()
+        src = np.concatenate((pairs[:, 0], pairs[:, 1]))
+        dst = np.concatenate((pairs[:, 1], pairs[:, 0]))
+        del pairs
+        order = np.argsort(src, kind="stable")
+        src = src[order]
+        rank = np.arange(len(src))
+        rank -= np.maximum.accumulate(np.where(_run_starts(src), rank, 0))
+        indices[fill[src] + rank] = dst[order]
+        fill += np.bincount(src, minlength=n)
+    del fill
+
+    indptr, indices = _sort_and_dedupe(indptr, indices, n)
+    G = CSRGraph(indptr, indices, assume_sorted=True)
+    elapsed = time.perf_counter() - start
+    stats = {
+        'edges_read': edges_read,
+        'edges': int(G.number_of_edges()),
+        'nodes': n,
+        'parse_seconds': parsed - start,
+        'seconds': elapsed,
+        'edges_per_sec': edges_read / elapsed if elapsed else 0.0,
+    }
+    return G, labels, stats
+
+
+# np.unique and np.searchsorted(labels, values), done with sorts, which are
+# several times faster on arrays of this size
+def _run_starts(ordered):
+    return np.concatenate(([True], ordered[1:] != ordered[:-1]))
+
+
+def _distinct(values):
+    ordered = np.sort(values, axis=None)
+    return ordered[_run_starts(ordered)] if len(ordered) else ordered
+
+
+def _all_labels(chunks):
+    # distinct names of all chunks, merging the names of a few chunks at a
+    # time so no more than about twice the final label array is pending
+    labels = np.zeros(0, chunks[0].dtype if chunks else np.int64)
+    pending = []
+    waiting = 0
+    for c in chunks:
+        pending.append(_distinct(c))
+        waiting += len(pending[-1])
+        if waiting > max(len(labels), 1 << 20):
+            labels = _distinct(np.concatenate([labels] + pending))
+            pending = []
+            waiting = 0
+    return _distinct(np.concatenate([labels] + pending)) if pending else labels
+
+
+def _relabel(labels, values, typecode):
+    flat = values.ravel()
+    order = np.argsort(flat)
+    ordered = flat[order]
+    starts = _run_starts(ordered)
+    ids = np.empty(len(flat), dtype=typecode)
+    ids[order] = np.searchsorted(labels, ordered[starts])[np.cumsum(starts) - 1]
+    return ids.reshape(values.shape)
+
+
+def _sort_and_dedupe(indptr, indices, n, block=1 << 18):
+    # Sorts every row and drops repeats, a block of about `block` entries at
+    # a time, compacting into indices itself (the output never overtakes the
+    # input). Entries are sorted as int64 keys row * n + neighbour; a key is
+    # a self loop exactly when it is a multiple of n + 1.
+    counts = np.zeros(n, dtype=np.int64)
+    out = 0
+    a = 0
+    while a < n:
+        b = max(a + 1, int(np.searchsorted(indptr, indptr[a] + block, "right")) - 1)
+        b = min(b, n)
+        start, end = indptr[a], indptr[b]
+        key = np.repeat(np.arange(a, b, dtype=np.int64) * n, np.diff(indptr[a:b + 1]))
+        key += indices[start:end]
+        key.sort()
+        if len(key):
+            key = key[_run_starts(key)]
+        # deduping left one copy of each self loop, put the second one back
+        loops = np.flatnonzero(key % (n + 1) == 0)
+        key = np.insert(key, loops, key[loops])
+        counts[a:b] = np.bincount(key // n - a, minlength=b - a)
+        indices[out:out + len(key)] = key % n
+        out += len(key)
+        a = b
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+    return indptr, indices[:out].copy() if out < len(indices) else indices
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path")
+    parser.add_argument("--delimiter", default=None, help="default: whitespace, or ',' for .csv files")
+    parser.add_argument("--strings", action="store_true", help="node names are not integers")
+    parser.add_argument("--header", action="store_true", help="skip the first line")
+    parser.add_argument("--out", help="save the graph here (see graph_file.py)")
+    args = parser.parse_args()
+
+    G, labels, stats = read_edge_list(args.path, args.delimiter, numeric=not args.strings,
+                                      header=args.header)
+    print(f"{stats['nodes']} nodes, {stats['edges']} edges ({stats['edges_read']} lines) "
+          f"in {stats['seconds']:.2f} s: {stats['edges_per_sec']:,.0f} edges/sec")
+    if args.out:
+        from graph_file import save_graph
+        save_graph(G, args.out)
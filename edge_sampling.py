@@ -0,0 +1,107 @@
+# Random edge sampling for simple undirected graphs on nodes 0..n-1.
+#
+# Every unordered pair u < v gets an index k in [0, n(n-1)/2) (pairs are
+# numbered column by column: (0,1), (0,2), (1,2), (0,3), ...), so sampling
+# edges is sampling distinct ints from that range and decoding them.
+#
+# rng can be None (the global random module), a random.Random, or a seeded
+# numpy.random.Generator for reproducible runs.
+import math
+import random
+
+
+def number_of_pairs(n):
+    return n * (n - 1) // 2
+
+
+def pair_from_index(k):
+    # largest v with v(v-1)/2 <= k, then u is the offset inside column v
+    v = (1 + math.isqrt(1 + 8 * k)) // 2
+    return k - v * (v - 1) // 2, v
+
+
+def sample_edges(n, m, rng=None):
+    # m distinct edges chosen uniformly at random (m is capped at the number
+    # of pairs). Sparse requests sample m indices directly; dense ones sample
+    # the pairs to leave out, so the cost is O(m) either way and never
+    # degrades into rejection retries near the complete graph.
+    total = number_of_pairs(n)
+    m = max(0, min(m, total))
+    if _is_numpy(rng):
+        return _sample_edges_numpy(total, m, rng)
+    if 2 * m <= total:
+        return [pair_from_index(k) for k in _sample_indices(total, m, rng)]
+    missing = set(_sample_indices(total, total - m, rng))
+    return [pair_from_index(k) for k in range(total) if k not in missing]
+
+
+def random_edge_order(n, rng=None):
+    # lazily yields all pairs in uniformly random order (Fisher-Yates over
+    # the pair indices, only remembering the swapped slots), so the first m
+    # pairs are a uniform random m-edge graph and a caller can stop early
+    total = number_of_pairs(n)
+    swapped = {}
+    for i in range(total):
+        j = _randrange(rng, i, total)
+        k = swapped.get(j, j)
+        swapped[j] = swapped.pop(i, i)
+        yield pair_from_index(k)
+
+
+def gnp_edges(n, p, rng=None):
+    # Erdos-Renyi G(n, p) edges by geometric skipping (Batagelj & Brandes):
+    # jump straight to the next kept pair instead of flipping a coin per pair
+    total = number_of_pairs(n)
+    if p <= 0:
+        return []
+    if p >= 1:
+        return [pair_from_index(k) for k in range(total)]
+    log_q = math.log(1.0 - p)
+    edges = []
+    k = -1
+    while True:
+        k += 1 + int(math.log(1.0 - _uniform(rng)) / log_q)
+        if k >= total:
+            return edges
+        edges.append(pair_from_index(k))
+
+
+def _is_numpy(rng):
+    return hasattr(rng, "integers")
+
+
+def _uniform(rng):
+    if rng is None:
+        return random.random()
+    return rng.random()
+
+
+def _randrange(rng, start, stop):
+    if _is_numpy(rng):
+        return int(rng.integers(start, stop))
+    return (rng or random).randrange(start, stop)
+
+
+def _sample_indices(total, k, rng):
+    if k == 0:
+        return []
+    return (rng or random).sample(range(total), k)
+
+
+def _sample_edges_numpy(total, m, rng):
+    # same sparse/dense split, but sampling and decoding are vectorized
+    import numpy as np
+
+    if 2 * m <= total:
+        k = rng.choice(total, size=m, replace=False)
+    else:
+        keep = np.ones(total, dtype=bool)
+        keep[rng.choice(total, size=total - m, replace=False)] = False
+        k = np.flatnonzero(keep)
+    k = k.astype(np.int64)
+    v = ((1 + np.sqrt(1 + 8 * k.astype(np.float64))) // 2).astype(np.int64)
+    # float sqrt can be off by one for huge k
+    v -= v * (v - 1) // 2 > k
+    v += (v + 1) * v // 2 <= k
+    u = k - v * (v - 1) // 2
+    return list(zip(u.tolist(), v.tolist()))
@@ -0,0 +1,46 @@
+# Script version of experiment 1 (see exp1_cycle.ipynb) so the trials can
+# run in worker processes.
+import argparse
+import matplotlib.pyplot as plt
+from graph import has_cycle, create_random_graph
+from trials import run_trial_grid
+
+
+def cycle_trial(num_nodes, e):
+    return {"cycles": 1 if has_cycle(create_random_graph(num_nodes, e)) else 0}
+
+
+def experiment1(num_nodes=100, edge_values=None, trials=200, workers=1, seed=0):
+    if edge_values is None:
+        edge_values = list(range(0, 501, 25))
+
+    configs = [(num_nodes, e) for e in edge_values]
+    totals = run_trial_grid(cycle_trial, configs, trials, seed=seed, workers=workers)
+    return [(e, t.get("cycles", 0) / trials) for e, t in zip(edge_values, totals)]
+
+
+def plot_results(results):
+    edges = [e for e, p in results]
+    probs = [p for e, p in results]
+
+    plt.figure()
+    plt.plot(edges, probs, marker='o')
+    plt.xlabel("Number of edges")
+    plt.ylabel("P(graph has a cycle)")
+    plt.title("Experiment 1: Cycle Probability vs Edges")
+    plt.grid(True)
+    plt.savefig("images/exp1_cycle_probability.png", dpi=300, bbox_inches="tight")
+    plt.show()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    results = experiment1(num_nodes=100, edge_values=list(range(0, 501, 25)), trials=200,
+                          workers=args.workers, seed=args.seed)
+    for e, p in results:
+        print(f"  edges={e:>4},  P(cycle) = {p:.3f}")
+    plot_results(results)
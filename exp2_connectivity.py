@@ -1,7 +1,10 @@
+import argparse
 import time
 import functools
 import matplotlib.pyplot as plt
-from graph import create_random_graph, is_connected
+from graph import connected_components, create_random_graph
+from trials import run_trial_grid
+from union_find import sweep_snapshots
 
 
 def timer_decorator(func):
@@ -14,29 +17,69 @@ def timer_decorator(func):
     return wrapper
 
 
+def connected_trial(num_nodes, j):
+    # one labeling pass gives both connectivity and the giant component
+    comps = connected_components(create_random_graph(num_nodes, j))
+    return {"connected": 1 if comps.count() <= 1 else 0, "giant": comps.giant_fraction()}
+
+
+def sweep_trial(num_nodes, edge_values):
+    totals = {}
+    for i, (components, largest) in enumerate(sweep_snapshots(num_nodes, edge_values)):
+        totals[("connected", i)] = 1 if components <= 1 else 0
+        totals[("giant", i)] = largest / num_nodes if num_nodes else 0.0
+    return totals
+
+
 @timer_decorator
-def run_connectivity_experiment(num_nodes, edge_values, num_runs):
+def run_connectivity_experiment(num_nodes, edge_values, num_runs, workers=1, seed=0):
     """
     For each edge count in edge_values, generates num_runs random graphs
-    and returns the proportion that are connected.
+    and returns the proportion that are connected, along with the average
+    fraction of nodes in the largest (giant) component.
     """
     probabilities = []
+    giant_fractions = []
 
-    for j in edge_values:
-        connected_count = sum(
-            1 for _ in range(num_runs)
-            if is_connected(create_random_graph(num_nodes, j))
-        )
-        prob = connected_count / num_runs
+    configs = [(num_nodes, j) for j in edge_values]
+    totals = run_trial_grid(connected_trial, configs, num_runs, seed=seed, workers=workers)
+    for j, t in zip(edge_values, totals):
+        prob = t.get("connected", 0) / num_runs
+        giant = t.get("giant", 0) / num_runs
         probabilities.append(prob)
-        print(f"  nodes={num_nodes}, edges={j:>4},  P(connected) = {prob:.2f}")
+        giant_fractions.append(giant)
+        print(f"  nodes={num_nodes}, edges={j:>4},  P(connected) = {prob:.2f},  giant = {giant:.2f}")
+
+    return probabilities, giant_fractions
+
 
-    return probabilities
+@timer_decorator
+def run_connectivity_sweep(num_nodes, edge_values, num_runs, workers=1, seed=0):
+    """
+    Same output as run_connectivity_experiment, but each run inserts one
+    random edge permutation into a union-find and reads off connectivity and
+    the largest component at every edge count in a single pass.
+    """
+    edge_values = sorted(edge_values)
+    totals = run_trial_grid(sweep_trial, [(num_nodes, tuple(edge_values))], num_runs,
+                            seed=seed, workers=workers)[0]
+    probabilities = [totals.get(("connected", i), 0) / num_runs for i in range(len(edge_values))]
+    giant_fractions = [totals.get(("giant", i), 0) / num_runs for i in range(len(edge_values))]
 
+    for j, prob, giant in zip(edge_values, probabilities, giant_fractions):
+        print(f"  nodes={num_nodes}, edges={j:>4},  P(connected) = {prob:.2f},  giant = {giant:.2f}")
 
-def plot_single_curve(edge_values, probabilities, num_nodes, num_runs):
+    return probabilities, giant_fractions
+
+
+def plot_single_curve(edge_values, probabilities, num_nodes, num_runs, giant_fractions=None):
     plt.figure(figsize=(9, 5))
-    plt.plot(edge_values, probabilities, marker='o', color='steelblue', linewidth=2, markersize=6)
+    plt.plot(edge_values, probabilities, marker='o', color='steelblue', linewidth=2, markersize=6,
+             label="P(connected)")
+    if giant_fractions is not None:
+        plt.plot(edge_values, giant_fractions, marker='s', color='darkorange', linewidth=2, markersize=5,
+                 label="Avg. fraction of nodes in giant component")
+        plt.legend()
     plt.xlabel("Number of Edges", fontsize=12)
     plt.ylabel("P(graph is connected)", fontsize=12)
     plt.title(
@@ -52,6 +95,13 @@ def plot_single_curve(edge_values, probabilities, num_nodes, num_runs):
 
 if __name__ == "__main__":
 
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sweep", action="store_true",
+                        help="use the single-pass union-find sweep instead of one BFS per graph")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
     NUM_RUNS = 100
 
     print("=" * 50)
@@ -61,7 +111,8 @@ if __name__ == "__main__":
     NODES = 100
     EDGE_VALUES = list(range(0, 501, 25))
 
-    probs = run_connectivity_experiment(NODES, EDGE_VALUES, NUM_RUNS)
-    plot_single_curve(EDGE_VALUES, probs, NODES, NUM_RUNS)
+    run = run_connectivity_sweep if args.sweep else run_connectivity_experiment
+    probs, giants = run(NODES, EDGE_VALUES, NUM_RUNS, workers=args.workers, seed=args.seed)
+    plot_single_curve(EDGE_VALUES, probs, NODES, NUM_RUNS, giants)
 
     print("\nDone.")
\ No newline at end of file
@@ -1,93 +1,162 @@
+import argparse
+import instrument
 import matplotlib.pyplot as plt
-from graph import create_random_graph, MVC, approx1, approx2, approx3
+import numpy as np
+import batch_kernel as bk
+from graph import create_random_graph, MVC, approx1, approx1_reference, approx2, approx3
+from local_search import approx4
+from result_store import ResultStore
+from trials import run_trial_grid
 
-def run_experiment(n_nodes=8, runs_per_edge=1000):
+ALGORITHMS = ('approx1', 'approx2', 'approx3', 'approx4')
+LOCAL_SEARCH_STEPS = 100  # swaps per graph for approx4, plenty at these sizes
+# (it stops early once it reaches the optimum, which it almost always does)
+
+# names of the two sweeps in a result store (see result_store.py)
+EDGE_SWEEP = 'exp3'
+NODE_SWEEP = 'exp3-nodes'
+
+# reference=True scores approx1_reference, the original approx1, in
+# approx1's place
+def ratio_trial(n_nodes, num_edges, reference=False):
+    G = create_random_graph(n_nodes, num_edges)
+    greedy = approx1_reference if reference else approx1
+
+    mvc_size = len(MVC(G))
+
+    if mvc_size == 0:
+        return None
+
+    return {
+        'runs': 1,
+        'approx1': len(greedy(G)) / mvc_size,
+        'approx2': len(approx2(G)) / mvc_size,
+        'approx3': len(approx3(G)) / mvc_size,
+        'approx4': len(approx4(G, max_steps=LOCAL_SEARCH_STEPS, target=mvc_size)) / mvc_size
+    }
+
+
+# Same totals as run_trial_grid(ratio_trial, ...) would add up for one
+# config, from the vectorized kernel in batch_kernel.py (except approx4,
+# which has no batch version)
+def batch_totals(n_nodes, num_edges, runs, rng):
+    totals = {'runs': 0, 'approx1': 0.0, 'approx2': 0.0, 'approx3': 0.0}
+    for start in range(0, runs, bk.BATCH):
+        words = bk.random_batch(n_nodes, num_edges, min(bk.BATCH, runs - start), rng)
+        mvc = bk.mvc_sizes(words, n_nodes)
+        keep = mvc > 0  # ratio_trial skips graphs without edges
+        words, mvc = words[keep], mvc[keep]
+        totals['runs'] += len(words)
+        totals['approx1'] += float((bk.approx1_sizes(words, n_nodes) / mvc).sum())
+        totals['approx2'] += float((bk.approx2_sizes(words, n_nodes, rng) / mvc).sum())
+        totals['approx3'] += float((bk.approx3_sizes(words, n_nodes, rng) / mvc).sum())
+    return totals
+
+
+# batch=True runs the whole grid through batch_totals in this process
+# (needs n_nodes <= batch_kernel.MAX_NODES; workers and store are unused).
+# With a store, trials already recorded there under experiment are not run
+# again and new ones are recorded as they finish (approx1_reference runs
+# under experiment + '-reference').
+def run_grid(configs, runs, workers=1, seed=0, batch=False, store=None, experiment=EDGE_SWEEP):
+    if batch:
+        if any(reference for _, _, reference in configs):
+            raise ValueError("batch mode has no approx1_reference")
+        return [batch_totals(n, e, runs, np.random.default_rng([seed, n, e])) for n, e, _ in configs]
+    keys = [(experiment + '-reference' if reference else experiment, n, e) for n, e, reference in configs]
+    return run_trial_grid(ratio_trial, configs, runs, seed=seed, workers=workers, store=store, keys=keys)
+
+
+def average_ratios(totals):
+    runs = totals.get('runs', 0)
+    return {name: totals[name] / runs if runs else 0 for name in ALGORITHMS if name in totals or not runs}
+
+
+def run_experiment(n_nodes=8, runs_per_edge=1000, workers=1, seed=0, batch=False, store=None,
+                   reference=False):
     max_edges = n_nodes * (n_nodes - 1) // 2
     edge_counts = list(range(1, max_edges + 1, 2))
     
-    ratios = {
-        'approx1': [],
-        'approx2': [],
-        'approx3': []
-    }
+    ratios = {}
     
-    for num_edges in edge_counts:
-        print(f"Testing {num_edges} edges...")
-        
-        approx1_ratios = []
-        approx2_ratios = []
-        approx3_ratios = []
-        
-        for _ in range(runs_per_edge):
-            G = create_random_graph(n_nodes, num_edges)
-            
-            mvc_size = len(MVC(G))
-            
-            if mvc_size == 0:
-                continue
-            
-            a1_size = len(approx1(G))
-            a2_size = len(approx2(G))
-            a3_size = len(approx3(G))
-            
-            approx1_ratios.append(a1_size / mvc_size)
-            approx2_ratios.append(a2_size / mvc_size)
-            approx3_ratios.append(a3_size / mvc_size)
-        
-        ratios['approx1'].append(sum(approx1_ratios) / len(approx1_ratios) if approx1_ratios else 0)
-        ratios['approx2'].append(sum(approx2_ratios) / len(approx2_ratios) if approx2_ratios else 0)
-        ratios['approx3'].append(sum(approx3_ratios) / len(approx3_ratios) if approx3_ratios else 0)
+    print(f"Testing {len(edge_counts)} edge counts on {workers} worker(s)...")
+    configs = [(n_nodes, num_edges, reference) for num_edges in edge_counts]
+    for totals in run_grid(configs, runs_per_edge, workers, seed, batch, store, EDGE_SWEEP):
+        for name, value in average_ratios(totals).items():
+            ratios.setdefault(name, []).append(value)
     
     return edge_counts, ratios
 
 
-def run_node_experiment(node_counts=[6, 8, 10], runs_per_config=500):
+def run_node_experiment(node_counts=[6, 8, 10], runs_per_config=500, workers=1, seed=0,
+                        batch=False, store=None, reference=False):
     results = {}
     
-    for n in node_counts:
-        print(f"\n=== Testing with {n} nodes ===")
-        max_edges = n * (n - 1) // 2
-        num_edges = max_edges // 2  # 50% density
-        
-        approx1_ratios = []
-        approx2_ratios = []
-        approx3_ratios = []
-        
-        for i in range(runs_per_config):
-            if i % 100 == 0:
-                print(f"  Run {i}/{runs_per_config}")
-            
-            G = create_random_graph(n, num_edges)
-            mvc_size = len(MVC(G))
-            
-            if mvc_size == 0:
-                continue
-            
-            approx1_ratios.append(len(approx1(G)) / mvc_size)
-            approx2_ratios.append(len(approx2(G)) / mvc_size)
-            approx3_ratios.append(len(approx3(G)) / mvc_size)
-        
-        results[n] = {
-            'approx1': sum(approx1_ratios) / len(approx1_ratios),
-            'approx2': sum(approx2_ratios) / len(approx2_ratios),
-            'approx3': sum(approx3_ratios) / len(approx3_ratios)
-        }
+    # 50% density
+    configs = [(n, n * (n - 1) // 2 // 2, reference) for n in node_counts]
+    all_totals = run_grid(configs, runs_per_config, workers, seed, batch, store, NODE_SWEEP)
+    for n, totals in zip(node_counts, all_totals):
+        results[n] = average_ratios(totals)
     
     return results
 
 
-def plot_results(edge_counts, ratios, n_nodes):
+# The results of run_experiment / run_node_experiment rebuilt from what a
+# store has recorded for the seed, without running anything. Every point is
+# averaged over its first runs trials; with runs=None, over as many as every
+# point has recorded. Points with fewer (a run that was cut short) are
+# reported and left out, so both can come back empty. Each returns runs as
+# well.
+def stored_ratios(store, n_nodes, seed=0, runs=None, reference=False):
+    experiment = EDGE_SWEEP + '-reference' if reference else EDGE_SWEEP
+    configs = [(n, edges) for n, edges in store.configs(experiment, seed) if n == n_nodes]
+    points, runs = _complete_points(store, experiment, configs, seed, runs)
+    edge_counts = []
+    ratios = {}
+    for n, edges, totals in points:
+        edge_counts.append(edges)
+        for name, value in average_ratios(totals).items():
+            ratios.setdefault(name, []).append(value)
+    return edge_counts, ratios, runs
+
+
+def stored_node_results(store, seed=0, runs=None, reference=False):
+    experiment = NODE_SWEEP + '-reference' if reference else NODE_SWEEP
+    points, runs = _complete_points(store, experiment, store.configs(experiment, seed), seed, runs)
+    return {n: average_ratios(totals) for n, edges, totals in points}, runs
+
+
+def _complete_points(store, experiment, configs, seed, runs):
+    if runs is None:
+        found = [store.totals(experiment, n, edges, seed)[1] for n, edges in configs]
+        runs = min([count for count in found if count], default=0)
+    points = []
+    short = []
+    for n, edges in configs:
+        totals, found = store.totals(experiment, n, edges, seed, runs)
+        if found and found == runs:
+            points.append((n, edges, totals))
+        else:
+            short.append(f"n={n} edges={edges} ({found})")
+    if short:
+        print(f"Skipping {len(short)} point(s) with fewer than {runs} recorded runs: " + ", ".join(short))
+    return points, runs
+
+
+def plot_results(edge_counts, ratios, n_nodes, runs=1000):
     plt.figure(figsize=(10, 6))
     
     plt.plot(edge_counts, ratios['approx1'], 'b-o', label='approx1 (Greedy by Degree)', markersize=4)
     plt.plot(edge_counts, ratios['approx2'], 'r-s', label='approx2 (Random Vertex)', markersize=4)
     plt.plot(edge_counts, ratios['approx3'], 'g-^', label='approx3 (Random Edge)', markersize=4)
+    if 'approx4' in ratios:
+        plt.plot(edge_counts, ratios['approx4'], 'm-d', label='approx4 (Local Search)', markersize=4)
     
     plt.axhline(y=1.0, color='gray', linestyle='--', alpha=0.5, label='Optimal (ratio = 1.0)')
     
     plt.xlabel('Number of Edges')
     plt.ylabel('Performance Ratio (Approx Size / MVC Size)')
-    plt.title(f'Vertex Cover Approximation Performance ({n_nodes} nodes, 1000 runs per point)')
+    plt.title(f'Vertex Cover Approximation Performance ({n_nodes} nodes, {runs} runs per point)')
     plt.legend()
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
@@ -101,16 +170,19 @@ def plot_node_results(node_results):
     
     plt.figure(figsize=(8, 5))
     
-    approx1_vals = [node_results[n]['approx1'] for n in node_counts]
-    approx2_vals = [node_results[n]['approx2'] for n in node_counts]
-    approx3_vals = [node_results[n]['approx3'] for n in node_counts]
+    bars = [('approx1', 'approx1 (Greedy)', 'blue'),
+            ('approx2', 'approx2 (Random Vertex)', 'red'),
+            ('approx3', 'approx3 (Random Edge)', 'green'),
+            ('approx4', 'approx4 (Local Search)', 'purple')]
+    bars = [bar for bar in bars if bar[0] in node_results[node_counts[0]]]
     
     x = range(len(node_counts))
-    width = 0.25
+    width = 0.8 / len(bars)
     
-    plt.bar([i - width for i in x], approx1_vals, width, label='approx1 (Greedy)', color='blue', alpha=0.7)
-    plt.bar(x, approx2_vals, width, label='approx2 (Random Vertex)', color='red', alpha=0.7)
-    plt.bar([i + width for i in x], approx3_vals, width, label='approx3 (Random Edge)', color='green', alpha=0.7)
+    for k, (name, label, color) in enumerate(bars):
+        offset = (k - (len(bars) - 1) / 2) * width
+        plt.bar([i + offset for i in x], [node_results[n][name] for n in node_counts], width,
+                label=label, color=color, alpha=0.7)
     
     plt.axhline(y=1.0, color='gray', linestyle='--', alpha=0.5)
     
@@ -131,33 +203,82 @@ def print_results_table(edge_counts, ratios):
     print("RESULTS TABLE (late format because we love latex woo)")
     print("="*70)
     
+    names = [name for name in ALGORITHMS if name in ratios]
     for i, edges in enumerate(edge_counts):
-        print(f"{edges} & {ratios['approx1'][i]:.3f} & {ratios['approx2'][i]:.3f} & {ratios['approx3'][i]:.3f} \\\\")
+        print(f"{edges} & " + " & ".join(f"{ratios[name][i]:.3f}" for name in names) + " \\\\")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch", action="store_true",
+                        help="use the vectorized kernel (batch_kernel.py) and --runs graphs per point")
+    parser.add_argument("--runs", type=int,
+                        help="graphs per point (default 1000 and 500 for the two sweeps, 1000000 "
+                             "with --batch, and with --from-store as many as every point has)")
+    parser.add_argument("--reference-approx1", action="store_true",
+                        help="score the original approx1 (graph.approx1_reference), whose ties go "
+                             "differently, to regenerate results made with it")
+    parser.add_argument("--store", metavar="PATH",
+                        help="record results in PATH as they finish and skip trials already recorded "
+                             "there")
+    parser.add_argument("--from-store", action="store_true",
+                        help="only plot and print what --store has recorded, without running trials")
+    parser.add_argument("--instrument", metavar="PATH",
+                        help="write operation counters and timings to PATH (.json, or .prof for "
+                             "cProfile stats); only work done in this process is recorded")
+    args = parser.parse_args()
+    if args.batch and args.store:
+        parser.error("--batch results are not recorded in a store")
+    if args.batch and args.reference_approx1:
+        parser.error("--batch has no approx1_reference")
+    if args.from_store and not args.store:
+        parser.error("--from-store needs --store")
+    if args.instrument:
+        instrument.record_to(args.instrument)
+    store = ResultStore(args.store) if args.store else None
+
     print("="*60)
     print("EXPERIMENT 3: Vertex Cover Approximation Comparison")
     print("="*60)
     
     N_NODES = 8
-    RUNS = 1000
+    RUNS = args.runs or (1000000 if args.batch else 1000)
     
+    if args.from_store:
+        edge_counts, ratios, RUNS = stored_ratios(store, N_NODES, args.seed, args.runs, args.reference_approx1)
+        if not edge_counts:
+            parser.error(f"{args.store} has no complete results for n={N_NODES} with seed {args.seed}")
     print(f"\nParameters: n={N_NODES} nodes, {RUNS} runs per edge count")
     
-    edge_counts, ratios = run_experiment(n_nodes=N_NODES, runs_per_edge=RUNS)
-    plot_results(edge_counts, ratios, N_NODES)
+    if not args.from_store:
+        edge_counts, ratios = run_experiment(n_nodes=N_NODES, runs_per_edge=RUNS,
+                                             workers=args.workers, seed=args.seed,
+                                             batch=args.batch, store=store,
+                                             reference=args.reference_approx1)
+    plot_results(edge_counts, ratios, N_NODES, RUNS)
     print_results_table(edge_counts, ratios)
     
     print("\n" + "="*60)
     print("SECONDARY EXPERIMENT: Varying Node Count")
     print("="*60)
+    NODE_RUNS = args.runs or (1000000 if args.batch else 500)
     
-    node_results = run_node_experiment(node_counts=[6, 8, 10], runs_per_config=500)
+    if args.from_store:
+        node_results, NODE_RUNS = stored_node_results(store, args.seed, args.runs, args.reference_approx1)
+        if not node_results:
+            parser.error(f"{args.store} has no complete node count results with seed {args.seed}")
+        print(f"{NODE_RUNS} runs per node count")
+    else:
+        node_results = run_node_experiment(node_counts=[6, 8, 10], runs_per_config=NODE_RUNS,
+                                           workers=args.workers, seed=args.seed,
+                                           batch=args.batch, store=store,
+                                           reference=args.reference_approx1)
     plot_node_results(node_results)
     
     print("\n" + "="*60)
     print("NODE VARIATION RESULTS (LaTeX format !!!!)")
     print("="*60)
     for n, res in sorted(node_results.items()):
-        print(f"{n} & {res['approx1']:.3f} & {res['approx2']:.3f} & {res['approx3']:.3f} \\\\")
+        print(f"{n} & " + " & ".join(f"{res[name]:.3f}" for name in ALGORITHMS if name in res) + " \\\\")
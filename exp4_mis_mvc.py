@@ -1,7 +1,47 @@
+import argparse
+import instrument
 import matplotlib.pyplot as plt
-from graph import Graph, create_random_graph, MVC, MIS
+import numpy as np
+import batch_kernel as bk
+from graph import Graph, create_random_graph, MVC, MIS_brute_force, is_vertex_cover, is_independent_set
+from result_store import ResultStore
+from trials import run_trial_grid
 
-def run_experiment(n_nodes=8, runs_per_edge=100):
+def mis_mvc_trial(n_nodes, num_edges):
+    G = create_random_graph(n_nodes, num_edges)
+    
+    # graph.MIS is the complement of the MVC cover, which would make the
+    # check below hold by construction; search for the independent set on its own
+    cover, independent = MVC(G), MIS_brute_force(G)
+    mvc_size = len(cover)
+    mis_size = len(independent)
+    
+    assert is_vertex_cover(G, cover) and is_independent_set(G, independent)
+    # assertions !!
+    assert mvc_size + mis_size == n_nodes, \
+        f"Relationship violated: MVC={mvc_size}, MIS={mis_size}, sum={mvc_size+mis_size}, n={n_nodes}"
+    
+    return {'mvc': mvc_size, 'mis': mis_size}
+
+
+# mis_mvc_trial totals for one config from the vectorized kernel in
+# batch_kernel.py, which finds MVC and MIS sizes independently of each other
+def batch_totals(n_nodes, num_edges, runs, rng):
+    totals = {'mvc': 0, 'mis': 0}
+    for start in range(0, runs, bk.BATCH):
+        words = bk.random_batch(n_nodes, num_edges, min(bk.BATCH, runs - start), rng)
+        mvc = bk.mvc_sizes(words, n_nodes)
+        mis = bk.mis_sizes(words, n_nodes)
+        assert (mvc + mis == n_nodes).all(), "Relationship violated: |MVC| + |MIS| != n"
+        totals['mvc'] += int(mvc.sum())
+        totals['mis'] += int(mis.sum())
+    return totals
+
+
+# batch=True uses batch_totals in this process instead of trial workers
+# (needs n_nodes <= batch_kernel.MAX_NODES). With a store (result_store.py),
+# trials already recorded there under 'exp4' are not run again.
+def run_experiment(n_nodes=8, runs_per_edge=100, workers=1, seed=0, batch=False, store=None):
     max_edges = n_nodes * (n_nodes - 1) // 2
     edge_counts = list(range(0, max_edges + 1, 2))
     
@@ -9,24 +49,18 @@ def run_experiment(n_nodes=8, runs_per_edge=100):
     mis_sizes = []
     sums = []
     
-    for num_edges in edge_counts:
-        print(f"Testing {num_edges} edges...")
-        
-        mvc_sum = 0
-        mis_sum = 0
-        
-        for _ in range(runs_per_edge):
-            G = create_random_graph(n_nodes, num_edges)
-            
-            mvc_size = len(MVC(G))
-            mis_size = len(MIS(G))
-            
-            mvc_sum += mvc_size
-            mis_sum += mis_size
-            
-            # assertions !!
-            assert mvc_size + mis_size == n_nodes, \
-                f"Relationship violated: MVC={mvc_size}, MIS={mis_size}, sum={mvc_size+mis_size}, n={n_nodes}"
+    print(f"Testing {len(edge_counts)} edge counts on {workers} worker(s)...")
+    configs = [(n_nodes, num_edges) for num_edges in edge_counts]
+    if batch:
+        all_totals = [batch_totals(n_nodes, num_edges, runs_per_edge, np.random.default_rng([seed, n_nodes, num_edges]))
+                      for num_edges in edge_counts]
+    else:
+        keys = [('exp4', n_nodes, num_edges) for num_edges in edge_counts]
+        all_totals = run_trial_grid(mis_mvc_trial, configs, runs_per_edge, seed=seed, workers=workers,
+                                    store=store, keys=keys)
+    for totals in all_totals:
+        mvc_sum = totals['mvc']
+        mis_sum = totals['mis']
         
         mvc_sizes.append(mvc_sum / runs_per_edge)
         mis_sizes.append(mis_sum / runs_per_edge)
@@ -76,16 +110,39 @@ def print_results_table(edge_counts, mvc_sizes, mis_sizes, sums, n_nodes):
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--batch", action="store_true",
+                        help="use the vectorized kernel (batch_kernel.py) and --runs graphs per point")
+    parser.add_argument("--runs", type=int, default=1000000,
+                        help="graphs per point with --batch")
+    parser.add_argument("--store", metavar="PATH",
+                        help="record results in PATH as they finish and skip trials already recorded "
+                             "there")
+    parser.add_argument("--instrument", metavar="PATH",
+                        help="write operation counters and timings to PATH (.json, or .prof for "
+                             "cProfile stats); only work done in this process is recorded")
+    args = parser.parse_args()
+    if args.batch and args.store:
+        parser.error("--batch results are not recorded in a store")
+    if args.instrument:
+        instrument.record_to(args.instrument)
+    store = ResultStore(args.store) if args.store else None
+
     print("="*60)
     print("EXPERIMENT 4: MIS vs MVC Relationship")
     print("="*60)
     
     N_NODES = 8
-    RUNS = 100
+    RUNS = args.runs if args.batch else 100
     
     print(f"\nParameters: n={N_NODES} nodes, {RUNS} runs per edge count")
     print("Asserting: |MVC| + |MIS| = n\n")
     
-    edge_counts, mvc_sizes, mis_sizes, sums = run_experiment(n_nodes=N_NODES, runs_per_edge=RUNS)
+    edge_counts, mvc_sizes, mis_sizes, sums = run_experiment(n_nodes=N_NODES, runs_per_edge=RUNS,
+                                                             workers=args.workers, seed=args.seed,
+                                                             batch=args.batch,
+                                                             store=store)
     plot_results(edge_counts, mvc_sizes, mis_sizes, sums, N_NODES)
     print_results_table(edge_counts, mvc_sizes, mis_sizes, sums, N_NODES)
@@ -1,5 +1,17 @@
+import argparse
+from collections import Counter
 import matplotlib.pyplot as plt
-from graph import Graph, MVC, approx1
+from bitset import popcount
+from canonical import nonisomorphic_graphs
+from graph import Graph, MVC, approx1, approx1_reference, approx1_worst_size
+from result_store import ResultStore
+from trials import iter_map
+from vc_exact import min_vertex_cover_mask
+
+# name of the exhaustive analysis in a result store (see result_store.py); its
+# records are keyed by n and the first mask of the chunk, with no edge count
+# and seed 0 (and '-reference' appended for approx1_reference)
+EXPERIMENT = 'exp5'
 
 def generate_all_graphs(n):
     # Bitmasks wooo !
@@ -12,31 +24,128 @@ def generate_all_graphs(n):
                 G.add_edge(u, v)
         yield G
 
-def run_exhaustive_analysis(n=5):
-    ratios = []
+def graph_from_mask(n, mask):
+    all_edges = [(i, j) for i in range(n) for j in range(i+1, n)]
+    G = Graph(n)
+    for i, (u, v) in enumerate(all_edges):
+        if mask & (1 << i):
+            G.add_edge(u, v)
+    return G
+
+def worst_case_chunk(n, start, stop, reference=False):
+    # ratio histogram and first worst mask for masks in [start, stop);
+    # reference=True tests approx1_reference instead of approx1
+    greedy = approx1_reference if reference else approx1
+    counts = Counter()
     worst_ratio = 1.0
-    worst_graph = None
-    
-    for G in generate_all_graphs(n):
+    worst_mask = None
+    for mask in range(start, stop):
+        G = graph_from_mask(n, mask)
         mvc_size = len(MVC(G))
         if mvc_size == 0:
             continue
-        approx_size = len(approx1(G))
-        ratio = approx_size / mvc_size
-        ratios.append(ratio)
+        ratio = len(greedy(G)) / mvc_size
+        counts[ratio] += 1
         if ratio > worst_ratio:
             worst_ratio = ratio
-            worst_graph = G
+            worst_mask = mask
+    return counts, worst_ratio, worst_mask
+
+def _merge_chunks(n, chunks):
+    # chunks must be in mask order, so the earliest worst graph wins as before
+    counts = Counter()
+    worst_ratio = 1.0
+    worst_mask = None
+    for chunk_counts, chunk_worst, chunk_mask in chunks:
+        counts.update(chunk_counts)
+        if chunk_worst > worst_ratio:
+            worst_ratio = chunk_worst
+            worst_mask = chunk_mask
     
+    ratios = sorted(counts.elements())
+    worst_graph = graph_from_mask(n, worst_mask) if worst_mask is not None else None
     return ratios, worst_ratio, worst_graph
 
-def plot_results(ratios, n):
+def _stored_chunk(values):
+    return Counter(dict(values['counts'])), values['worst_ratio'], values['worst_mask']
+
+def run_exhaustive_analysis(n=5, workers=1, chunk_size=256, store=None, reference=False):
+    # With a store, chunks recorded there are read back instead of tested and
+    # every tested chunk is recorded as soon as it is done
+    total = 2 ** (n * (n - 1) // 2)
+    experiment = EXPERIMENT + '-reference' if reference else EXPERIMENT
+    tasks = [(n, start, min(start + chunk_size, total), reference) for start in range(0, total, chunk_size)]
+    chunks = [None] * len(tasks)
+    if store is not None:
+        for k, (_, start, stop, _) in enumerate(tasks):
+            values = store.get(experiment, n, None, 0, start, stop - start)
+            if values is not None:
+                chunks[k] = _stored_chunk(values)
+    
+    pending = [k for k, chunk in enumerate(chunks) if chunk is None]
+    for k, chunk in zip(pending, iter_map(worst_case_chunk, [tasks[k] for k in pending], workers)):
+        if store is not None:
+            chunk_counts, chunk_worst, chunk_mask = chunk
+            _, start, stop, _ = tasks[k]
+            values = {'counts': sorted(chunk_counts.items()), 'worst_ratio': chunk_worst, 'worst_mask': chunk_mask}
+            store.add(experiment, n, None, 0, start, values, stop - start)
+        chunks[k] = chunk
+    
+    return _merge_chunks(n, chunks)
+
+def stored_analysis(store, n, reference=False):
+    # run_exhaustive_analysis's results from the chunks a store has recorded,
+    # which cover every graph only if a run finished
+    experiment = EXPERIMENT + '-reference' if reference else EXPERIMENT
+    return _merge_chunks(n, [_stored_chunk(values) for _, _, values in store.trials(experiment, n, None, 0)])
+
+def run_reduced_analysis(n):
+    # Same worst case from one canonical representative per isomorphism
+    # class, all on bitmasks. approx1 breaks ties by node number, so copies of
+    # a class can get different covers; each class is scored by its worst
+    # labeling (approx1_worst_size). The worst ratio is exact, but the
+    # histogram counts classes by their worst ratio, which is not the
+    # distribution over labeled graphs that the exhaustive run gives.
+    # Every class of a whole edge level is held at once: n=8 takes about 20
+    # seconds, n=9 (274668 classes) about 14 minutes and 110 MB, and n=10
+    # (about 12 million classes) is out of reach.
+    counts = Counter()
+    worst_ratio = 1.0
+    worst_adj = None
+    for adj, labeled in nonisomorphic_graphs(n):
+        mvc_size = popcount(min_vertex_cover_mask(adj))
+        if mvc_size == 0:
+            continue
+        ratio = approx1_worst_size(adj) / mvc_size
+        counts[ratio] += 1
+        if ratio > worst_ratio:
+            worst_ratio = ratio
+            worst_adj = adj
+    
+    worst_graph = None
+    if worst_adj is not None:
+        worst_graph = Graph(n)
+        worst_graph.add_edges((u, v) for v in range(n) for u in range(v) if worst_adj[u] >> v & 1)
+    return counts, worst_ratio, worst_graph
+
+def as_counts(ratios):
+    # ratios as {ratio: number of graphs}, from either a list or a Counter
+    return ratios if isinstance(ratios, Counter) else Counter(ratios)
+
+# per_class=True for run_reduced_analysis's histogram of classes
+def plot_results(ratios, n, per_class=False):
+    counts = as_counts(ratios)
     plt.figure(figsize=(8, 5))
-    plt.hist(ratios, bins=20, edgecolor='black', alpha=0.7)
-    plt.axvline(x=max(ratios), color='red', linestyle='--', label=f'Worst case: {max(ratios):.2f}')
-    plt.xlabel('Performance Ratio (approx1 / MVC)')
-    plt.ylabel('Number of Graphs')
-    plt.title(f'Exhaustive Worst-Case Analysis of approx1 (all {len(ratios)} graphs with n={n})')
+    plt.hist(list(counts), weights=list(counts.values()), bins=20, edgecolor='black', alpha=0.7)
+    plt.axvline(x=max(counts), color='red', linestyle='--', label=f'Worst case: {max(counts):.2f}')
+    if per_class:
+        plt.xlabel('Worst Performance Ratio over Labelings (approx1 / MVC)')
+        plt.ylabel('Number of Isomorphism Classes')
+        plt.title(f'Worst Case of approx1 per Isomorphism Class ({counts.total()} classes with n={n})')
+    else:
+        plt.xlabel('Performance Ratio (approx1 / MVC)')
+        plt.ylabel('Number of Graphs')
+        plt.title(f'Exhaustive Worst-Case Analysis of approx1 (all {counts.total()} graphs with n={n})')
     plt.legend()
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
@@ -47,16 +156,65 @@ def print_latex_summary(ratios, worst_ratio):
     print("\n" + "="*60)
     print("SUMMARY")
     print("="*60)
-    print(f"Total graphs tested: {len(ratios)}")
+    counts = as_counts(ratios)
+    total = counts.total()
+    print(f"Total graphs tested: {total}")
+    print(f"Worst-case ratio: {worst_ratio:.2f}")
+    print(f"Optimal (ratio=1.0): {counts[1.0]} graphs")
+    print(f"Average ratio: {sum(r * c for r, c in counts.items())/total:.3f}")
+
+def print_reduced_summary(counts, worst_ratio):
+    # only what per-class worst ratios can tell, no averages over graphs
+    print("\n" + "="*60)
+    print("SUMMARY (one graph per isomorphism class)")
+    print("="*60)
+    print(f"Classes tested (graphs with edges): {counts.total()}")
     print(f"Worst-case ratio: {worst_ratio:.2f}")
-    print(f"Optimal (ratio=1.0): {sum(1 for r in ratios if r == 1.0)} graphs")
-    print(f"Average ratio: {sum(ratios)/len(ratios):.3f}")
+    print(f"Classes where every labeling is optimal: {counts[1.0]}")
 
 if __name__ == "__main__":
-    N = 5
-    print(f"Exhaustively testing approx1 on all graphs with n={N} vertices...")
-    print(f"Total graphs: 2^(5 choose 2) = 2^10 = 1024\n")
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--n", type=int, default=5)
+    parser.add_argument("--reduced", action="store_true",
+                        help="test one graph per isomorphism class, scored by its worst labeling; "
+                             "the histogram counts classes, not labeled graphs")
+    parser.add_argument("--reference-approx1", action="store_true",
+                        help="test the original approx1 (graph.approx1_reference), whose ties go "
+                             "differently, to regenerate results made with it")
+    parser.add_argument("--store", metavar="PATH",
+                        help="record tested chunks in PATH and skip chunks already recorded there")
+    parser.add_argument("--from-store", action="store_true",
+                        help="only plot and summarize what --store has recorded")
+    args = parser.parse_args()
+    if args.reduced and args.reference_approx1:
+        parser.error("--reduced only works with approx1's lowest-node tie-breaking")
+    if args.store and args.reduced:
+        parser.error("--reduced results are not recorded in a store")
+    if args.from_store and not args.store:
+        parser.error("--from-store needs --store")
+    store = ResultStore(args.store) if args.store else None
+
+    N = args.n
+    if args.reduced:
+        print(f"Testing approx1 on one graph per isomorphism class with n={N} vertices...")
+        print("Each class is scored by its worst labeling\n")
+    else:
+        print(f"Exhaustively testing approx1 on all graphs with n={N} vertices...")
+        print(f"Total graphs: 2^({N} choose 2) = 2^{N * (N - 1) // 2} = {2 ** (N * (N - 1) // 2)}\n")
     
-    ratios, worst_ratio, worst_graph = run_exhaustive_analysis(N)
-    plot_results(ratios, N)
-    print_latex_summary(ratios, worst_ratio)
+    if args.reduced:
+        ratios, worst_ratio, worst_graph = run_reduced_analysis(N)
+    elif args.from_store:
+        ratios, worst_ratio, worst_graph = stored_analysis(store, N, args.reference_approx1)
+        if not ratios:
+            parser.error(f"{args.store} has no results for n={N}")
+    else:
+        ratios, worst_ratio, worst_graph = run_exhaustive_analysis(N, workers=args.workers, store=store,
+                                                                   reference=args.reference_approx1)
+    if args.reduced:
+        plot_results(ratios, N, per_class=True)
+        print_reduced_summary(ratios, worst_ratio)
+    else:
+        plot_results(ratios, N)
+        print_latex_summary(ratios, worst_ratio)
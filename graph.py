@@ -1,27 +1,72 @@
+from array import array
+from bisect import bisect_left
 from collections import deque
+from collections.abc import Mapping
+import heapq
 import random
+import instrument
+from bitset import adjacency_masks, iter_bits, nodes_of, popcount
+from edge_sampling import gnp_edges, sample_edges
+from subsets import all_subsets, gray_code_subsets
+from traversal_cache import TraversalCache
+from vc_exact import min_vertex_cover_mask
 #Undirected graph using an adjacency list
 class Graph:
 
-    def __init__(self, n):
+    # hashed=True also keeps a set of neighbours per node, so duplicate checks
+    # in add_edge and are_connected are O(1) instead of a list scan
+    def __init__(self, n, hashed=False):
         self.adj = {}
         for i in range(n):
             self.adj[i] = []
+        self.nbr_sets = {i: set() for i in range(n)} if hashed else None
+        # bumped by every change made through add_node/add_edge(s), so cached
+        # traversals know when they are stale (editing adj directly skips this)
+        self.version = 0
+        self.cache = None
 
     def are_connected(self, node1, node2):
+        if self.nbr_sets is not None:
+            return node2 in self.nbr_sets[node1]
         return node2 in self.adj[node1]
 
     def adjacent_nodes(self, node):
         return self.adj[node]
 
     def add_node(self):
+        if self.nbr_sets is not None:
+            self.nbr_sets[len(self.adj)] = set()
         self.adj[len(self.adj)] = []
+        self.version += 1
 
     def add_edge(self, node1, node2):
-        if node1 not in self.adj[node2]:
+        if not self.are_connected(node2, node1):
             self.adj[node1].append(node2)
             self.adj[node2].append(node1)
-
+            if self.nbr_sets is not None:
+                self.nbr_sets[node1].add(node2)
+                self.nbr_sets[node2].add(node1)
+            self.version += 1
+
+    # Adds many edges in one pass, skipping ones already in the graph or
+    # repeated in the input. Without hashed mode the rows this batch touches
+    # are hashed once each instead of scanning a list per edge.
+    def add_edges(self, edges):
+        hashed = self.nbr_sets is not None
+        nbr_sets = self.nbr_sets if hashed else {}
+        for node1, node2 in edges:
+            if not hashed:
+                if node1 not in nbr_sets:
+                    nbr_sets[node1] = set(self.adj[node1])
+                if node2 not in nbr_sets:
+                    nbr_sets[node2] = set(self.adj[node2])
+            if node1 in nbr_sets[node2]:
+                continue
+            self.adj[node1].append(node2)
+            self.adj[node2].append(node1)
+            nbr_sets[node1].add(node2)
+            nbr_sets[node2].add(node1)
+            self.version += 1
 
     # FIX: Modify this since len() with no paramter will not work
     def number_of_nodes(self):
@@ -31,8 +76,141 @@ class Graph:
     def get_size(self):
         return len(self.adj)
 
+    def to_csr(self, index="sorted"):
+        return CSRGraph.from_graph(self, index)
+
+    # Caches BFS/DFS trees and component labels on this graph (see
+    # traversal_cache.py) until the next add_node/add_edge
+    def enable_cache(self, max_bytes=64 * 1024 * 1024):
+        self.cache = TraversalCache(max_bytes)
+        return self.cache
+
+
+# Read-only undirected graph in compressed sparse row form: the neighbours of
+# node u are indices[indptr[u]:indptr[u + 1]]. Both are flat arrays (the
+# array module by default, NumPy arrays also work) so each edge endpoint costs
+# 4 or 8 bytes instead of a Python int in a list.
+#
+# index picks how are_connected answers:
+#   None      scan the row, neighbour order is kept as given
+#   "sorted"  rows are sorted and searched with bisect, O(log d)
+#   "bitset"  one bit row per node, O(1) but n^2 / 8 bytes, for dense graphs
+class CSRGraph:
+
+    # assume_sorted=True skips checking that rows are sorted, for arrays
+    # known to be (e.g. loaded from a file written by graph_file.save_graph)
+    def __init__(self, indptr, indices, index="sorted", assume_sorted=False):
+        if index not in (None, "sorted", "bitset"):
+            raise ValueError(f"unknown CSR index {index!r}")
+        self.indptr = indptr
+        self.indices = indices
+        self.index = index
+        n = len(indptr) - 1
+        if index == "sorted" and not assume_sorted:
+            for u in range(n):
+                start, end = indptr[u], indptr[u + 1]
+                row = indices[start:end]
+                # only touch rows that need it, so pre-sorted data can stay read-only
+                if any(row[k] > row[k + 1] for k in range(len(row) - 1)):
+                    row = sorted(row)
+                    indices[start:end] = array(indices.typecode, row) if isinstance(indices, array) else row
+        self._bits = None
+        if index == "bitset":
+            width = (n + 7) // 8
+            self._bits = [bytearray(width) for _ in range(n)]
+            for u in range(n):
+                row = self._bits[u]
+                for k in range(indptr[u], indptr[u + 1]):
+                    v = indices[k]
+                    row[v >> 3] |= 1 << (v & 7)
+        self._view = memoryview(indices)
+        self.adj = _CSRAdjacency(self)
+        self.version = 0  # never changes, a CSRGraph is read-only
+        self.cache = None
+
+    @classmethod
+    def from_edges(cls, n, edges, index="sorted"):
+        # edges must be distinct and is read twice: count degrees, then fill
+        degree = array("q", bytes(8 * (n + 1)))
+        for u, v in edges:
+            degree[u + 1] += 1
+            degree[v + 1] += 1
+        for u in range(n):
+            degree[u + 1] += degree[u]
+        indptr = degree
+        typecode = "i" if n < 2 ** 31 else "q"
+        indices = array(typecode, bytes(array(typecode).itemsize * indptr[n]))
+        fill = array("q", indptr[:n])
+        for u, v in edges:
+            indices[fill[u]] = v
+            fill[u] += 1
+            indices[fill[v]] = u
+            fill[v] += 1
+        return cls(indptr, indices, index)
+
+    @classmethod
+    def from_graph(cls, G, index="sorted"):
+        n = G.get_size()
+        indptr = array("q", [0])
+        indices = array("i" if n < 2 ** 31 else "q")
+        for u in range(n):
+            indices.extend(G.adj[u])
+            indptr.append(len(indices))
+        return cls(indptr, indices, index)
+
+    def to_graph(self):
+        G = Graph(self.get_size())
+        for u in range(self.get_size()):
+            G.adj[u] = list(self.adjacent_nodes(u))
+        return G
+
+    def are_connected(self, node1, node2):
+        if self.index == "bitset":
+            return bool(self._bits[node1][node2 >> 3] >> (node2 & 7) & 1)
+        start, end = self.indptr[node1], self.indptr[node1 + 1]
+        if self.index == "sorted":
+            k = bisect_left(self.indices, node2, start, end)
+            return k < end and self.indices[k] == node2
+        return node2 in self._view[start:end]
+
+    def adjacent_nodes(self, node):
+        return self._view[self.indptr[node]:self.indptr[node + 1]]
+
+    def number_of_nodes(self):
+        return len(self.indptr) - 1
+
+    def get_size(self):
+        return len(self.indptr) - 1
+
+    def number_of_edges(self):
+        return self.indptr[len(self.indptr) - 1] // 2
+
+    def enable_cache(self, max_bytes=64 * 1024 * 1024):
+        self.cache = TraversalCache(max_bytes)
+        return self.cache
+
+
+# Lets code written against Graph.adj (G.adj[u], iterating G.adj, len(G.adj))
+# run on a CSRGraph without building any lists
+class _CSRAdjacency(Mapping):
+
+    def __init__(self, G):
+        self.G = G
+
+    def __getitem__(self, node):
+        if not 0 <= node < self.G.get_size():
+            raise KeyError(node)
+        return self.G.adjacent_nodes(node)
+
+    def __iter__(self):
+        return iter(range(self.G.get_size()))
+
+    def __len__(self):
+        return self.G.get_size()
+
 
 #Breadth First Search
+@instrument.span
 def BFS(G, node1, node2):
     Q = deque([node1])
     marked = {node1 : True}
@@ -43,16 +221,24 @@ def BFS(G, node1, node2):
         current_node = Q.popleft()
         for node in G.adj[current_node]:
             if node == node2:
+                _count_visited("BFS", G, marked)
                 return True
             if not marked[node]:
                 Q.append(node)
                 marked[node] = True
+    _count_visited("BFS", G, marked)
     return False
 
 # BFS2 WHAT I IMPLEMENTED
-def BFS2(G, node1, node2):
+# bidirectional=True searches from both ends instead (see bidirectional_BFS)
+@instrument.span
+def BFS2(G, node1, node2, bidirectional=False):
+    if bidirectional:
+        return bidirectional_BFS(G, node1, node2)
     if node1 == node2:
         return [node1]
+    if getattr(G, "cache", None) is not None:
+        return _path_from_pred(_cached_pred(G, "bfs", node1), node1, node2)
 
     Q = deque([node1])
     visited = set([node1])     # included start node
@@ -66,6 +252,7 @@ def BFS2(G, node1, node2):
                 pred[edge] = current_node
 
                 if edge == node2:
+                    _count_visited("BFS2", G, visited)
                     path = [node2]
                     while path[-1] != node1:
                         path.append(pred[path[-1]])
@@ -74,9 +261,71 @@ def BFS2(G, node1, node2):
 
                 Q.append(edge)  # keep BFS going
 
+    _count_visited("BFS2", G, visited)
     return []
 
+# Shortest path from node1 to node2 (same format as BFS2, [] if none) found by
+# growing BFS levels from both ends, always expanding the smaller frontier.
+# On big sparse graphs the two balls meet after touching roughly the square
+# root of what a one-sided search visits.
+@instrument.span
+def bidirectional_BFS(G, node1, node2):
+    if node1 == node2:
+        return [node1]
+
+    # node -> (parent, distance from that side's start)
+    seen1 = {node1: (None, 0)}
+    seen2 = {node2: (None, 0)}
+    frontier1 = [node1]
+    frontier2 = [node2]
+
+    while frontier1 and frontier2:
+        if len(frontier1) <= len(frontier2):
+            frontier1, meet = _expand_level(G, frontier1, seen1, seen2)
+        else:
+            frontier2, meet = _expand_level(G, frontier2, seen2, seen1)
+            if meet is not None:
+                meet = (meet[1], meet[0])
+        if meet is not None:
+            u, v = meet
+            path = [u]
+            while seen1[path[-1]][0] is not None:
+                path.append(seen1[path[-1]][0])
+            path.reverse()
+            while v is not None:
+                path.append(v)
+                v = seen2[v][0]
+            return path
+
+    return []
+
+# Expands one whole BFS level. Returns the next frontier and the best edge
+# (mine, theirs) joining the two searches, or None if they haven't met.
+def _expand_level(G, frontier, seen, other):
+    next_frontier = []
+    best = None
+    best_length = None
+    for u in frontier:
+        d = seen[u][1]
+        for v in G.adj[u]:
+            if v in other:
+                length = d + 1 + other[v][1]
+                if best is None or length < best_length:
+                    best = (u, v)
+                    best_length = length
+            elif v not in seen:
+                seen[v] = (u, d + 1)
+                next_frontier.append(v)
+    _count_visited("bidirectional_BFS", G, next_frontier, frontier)
+    return next_frontier, best
+
+@instrument.span
 def BFS3(G, start):
+    if getattr(G, "cache", None) is not None:
+        return dict(_cached_pred(G, "bfs", start))  # copy, the cached one is shared
+    return _bfs_pred(G, start)
+
+def _bfs_pred(G, start):
     Q = deque([start])
     visited = set([start])
     pred = {}  # child -> parent (predecessor)
@@ -89,10 +338,12 @@ def BFS3(G, start):
                 pred[v] = u
                 Q.append(v)
 
+    _count_visited("BFS3", G, visited)
     return pred
 
 
 #Depth First Search
+@instrument.span
 def DFS(G, node1, node2):
     S = [node1]
     marked = {}
@@ -104,14 +355,20 @@ def DFS(G, node1, node2):
             marked[current_node] = True
             for node in G.adj[current_node]:
                 if node == node2:
+                    _count_visited("DFS", G, marked)
                     return True
                 S.append(node)
+    _count_visited("DFS", G, marked)
     return False
 
+@instrument.span
 def DFS2(G, node1, node2):
     # Return a path from node1 to node2 using DFS; [] if none.
     if node1 == node2:
         return [node1]
+    if getattr(G, "cache", None) is not None:
+        # DFS3 records the same parents DFS2 would, so the walk gives the same path
+        return _path_from_pred(_cached_pred(G, "dfs", node1), node1, node2)
 
     stack = [node1]
     visited = set([node1])
@@ -121,6 +378,7 @@ def DFS2(G, node1, node2):
         current = stack.pop()
 
         if current == node2:
+            _count_visited("DFS2", G, visited)
             # reconstruct
             path = [node2]
             while path[-1] != node1:
@@ -134,10 +392,17 @@ def DFS2(G, node1, node2):
                 pred[nbr] = current
                 stack.append(nbr)
 
+    _count_visited("DFS2", G, visited)
     return []
 
 
+@instrument.span
 def DFS3(G, start):
+    if getattr(G, "cache", None) is not None:
+        return dict(_cached_pred(G, "dfs", start))  # copy, the cached one is shared
+    return _dfs_pred(G, start)
+
+def _dfs_pred(G, start):
     stack = [start]
     visited = set([start])
     pred = {}  # child -> parent (predecessor)
@@ -150,167 +415,602 @@ def DFS3(G, start):
                 pred[v] = u
                 stack.append(v)
 
+    _count_visited("DFS3", G, visited)
     return pred
 
-def has_cycle(G):
-    visited = set()
+# Predecessor tree of a BFS/DFS from start, from G.cache when possible.
+# Callers must not modify the returned dict.
+def _cached_pred(G, kind, start):
+    pred = G.cache.get(G, (kind, start))
+    if pred is None:
+        pred = _bfs_pred(G, start) if kind == "bfs" else _dfs_pred(G, start)
+        G.cache.put(G, (kind, start), pred)
+    return pred
 
-    def dfs(u, parent):
-        visited.add(u)
-        for v in G.adj[u]:
-            if v not in visited:
-                if dfs(v, u):
-                    return True
-            elif v != parent:
-                # visited neighbor that isn't the node we came from => cycle
-                return True
-        return False
+# O(path length) walk up a predecessor tree
+def _path_from_pred(pred, node1, node2):
+    if node2 not in pred:
+        return []
+    path = [node2]
+    while path[-1] != node1:
+        path.append(pred[path[-1]])
+    path.reverse()
+    return path
+
+# Instrumentation counters for a search: how many nodes it marked and how many
+# adjacency entries those nodes have (what a full expansion of them scans, so
+# an upper bound for searches that stop early). BFS/DFS pass their marked
+# dict; bidirectional_BFS passes each new level plus the level it expanded.
+def _count_visited(name, G, visited, expanded=None):
+    rec = instrument.recorder
+    if rec is None:
+        return
+    if isinstance(visited, dict):
+        visited = [u for u, seen in visited.items() if seen]
+    rec.count(name + ".nodes_visited", len(visited))
+    scanned = expanded if expanded is not None else visited
+    rec.count(name + ".edges_scanned", sum(len(G.adj[u]) for u in scanned))
+
+# A component is a tree exactly when it has one edge fewer than it has nodes,
+# so a graph has a cycle iff some component has |E| >= |V|. No recursion, so
+# long paths with millions of nodes are fine.
+@instrument.span
+def has_cycle(G):
+    # more edges than any forest on these nodes can have
+    if _degree_sum(G) // 2 >= G.get_size() > 0:
+        return True
 
     # graph might be disconnected, so check each component
-    for node in G.adj:
-        if node not in visited:
-            if dfs(node, None):
-                return True
-
-    return False
+    comps = connected_components(G)
+    return any(edges >= nodes for nodes, edges in zip(comps.sizes, comps.edges))
+
+# One entry per connected component:
+#   root        smallest-numbered node in the component
+#   nodes       number of nodes
+#   edges       number of edges
+#   cyclomatic  edges - nodes + 1, the number of independent cycles (0 for a tree)
+@instrument.span
+def cycle_report(G):
+    comps = connected_components(G)
+    report = []
+    for root, nodes, edges in zip(comps.roots, comps.sizes, comps.edges):
+        report.append({'root': root, 'nodes': nodes, 'edges': edges,
+                       'cyclomatic': edges - nodes + 1})
+    return report
+
+# Returns the nodes of some cycle in order (the last one is adjacent to the
+# first), or [] if the graph is a forest. Iterative DFS: the first edge to an
+# already visited node other than the parent goes back to an ancestor, and the
+# parent links from there spell out the cycle.
+@instrument.span
+def find_cycle(G):
+    n = G.get_size()
+    parent = [-1] * n
+    visited = [False] * n
+    for root in G.adj:
+        if visited[root]:
+            continue
+        visited[root] = True
+        stack = [(root, iter(G.adj[root]))]
+        while stack:
+            u, nbrs = stack[-1]
+            for v in nbrs:
+                if v == u:
+                    return [u]
+                if not visited[v]:
+                    visited[v] = True
+                    parent[v] = u
+                    stack.append((v, iter(G.adj[v])))
+                    break
+                if v != parent[u]:
+                    cycle = [u]
+                    while cycle[-1] != v:
+                        cycle.append(parent[cycle[-1]])
+                    cycle.reverse()
+                    return cycle
+            else:
+                stack.pop()
+    return []
 
+def _degree_sum(G):
+    return sum(len(G.adj[u]) for u in G.adj)
+
+# Connected components of G from one O(n + m) BFS labeling pass.
+#   labels  labels[v] is the component number of node v (compact int array)
+#   roots   smallest-numbered node of each component
+#   sizes   number of nodes in each component
+#   edges   number of edges in each component
+class Components:
+
+    def __init__(self, labels, roots, sizes, edges):
+        self.labels = labels
+        self.roots = roots
+        self.sizes = sizes
+        self.edges = edges
+
+    def count(self):
+        return len(self.sizes)
+
+    def giant_size(self):
+        return max(self.sizes, default=0)
+
+    # share of all nodes that sit in the largest component
+    def giant_fraction(self):
+        total = len(self.labels)
+        return self.giant_size() / total if total else 0.0
+
+# With G.cache enabled the result is cached and shared, don't modify it.
+@instrument.span
+def connected_components(G):
+    cache = getattr(G, "cache", None)
+    if cache is not None:
+        comps = cache.get(G, ("components",))
+        if comps is None:
+            comps = _label_components(G)
+            cache.put(G, ("components",), comps)
+        return comps
+    return _label_components(G)
+
+def _label_components(G):
+    n = G.get_size()
+    labels = array("i", [-1]) * n
+    roots = []
+    sizes = []
+    edges = []
+    for root in G.adj:
+        if labels[root] != -1:
+            continue
+        label = len(roots)
+        labels[root] = label
+        Q = [root]
+        degree_sum = 0
+        for u in Q:
+            nbrs = G.adj[u]
+            degree_sum += len(nbrs)
+            for v in nbrs:
+                if labels[v] == -1:
+                    labels[v] = label
+                    Q.append(v)
+        roots.append(root)
+        sizes.append(len(Q))
+        edges.append(degree_sum // 2)
+    instrument.count("connected_components.nodes_visited", n)
+    instrument.count("connected_components.edges_scanned", 2 * sum(edges))
+    return Components(labels, roots, sizes, edges)
+
+@instrument.span
 def is_connected(G):
     # An undirected graph is connected if every node is reachable from any start node.
     if len(G.adj) == 0:
         return True
 
-    start = next(iter(G.adj))  # grab any node key
-    Q = deque([start])
-    visited = set([start])
+    return connected_components(G).count() == 1
+
+# backend="hashed" returns a Graph in hashed mode, backend="csr" returns a
+# CSRGraph built straight from the edge list
+@instrument.span
+def graph_from_edges(n, edges, backend="dict"):
+    if backend not in ("dict", "hashed", "csr"):
+        raise ValueError(f"unknown graph backend {backend!r}")
+    if backend == "csr":
+        return CSRGraph.from_edges(n, edges)
+    G = Graph(n, hashed=backend == "hashed")
+    G.add_edges(edges)
+    return G
 
-    while Q:
-        u = Q.popleft()
-        for v in G.adj[u]:
-            if v not in visited:
-                visited.add(v)
-                Q.append(v)
+# j distinct random edges on i nodes (see edge_sampling.py). rng can be a
+# random.Random or a seeded numpy.random.Generator; None uses the global
+# random module.
+@instrument.span
+def create_random_graph(i, j, backend="dict", rng=None):
+    return graph_from_edges(i, sample_edges(i, j, rng), backend)
 
-    return len(visited) == len(G.adj)
+# count independent random graphs, all drawn from the same rng
+def create_random_graphs(i, j, count, backend="dict", rng=None):
+    return [create_random_graph(i, j, backend, rng) for _ in range(count)]
 
-def create_random_graph(i, j):
-    G = Graph(i)
-    max_edges = i * (i - 1) // 2
-    j = min(j, max_edges)
-
-    edges = set()
-    while len(edges) < j:
-        u = random.randrange(i)
-        v = random.randrange(i)
-        if u == v:
-            continue
-        a, b = (u, v) if u < v else (v, u)
-        if (a, b) in edges:
-            continue
-        edges.add((a, b))
-        G.add_edge(a, b)
-    return G
+# Erdos-Renyi G(n, p): every pair is an edge independently with probability p
+def create_gnp_graph(n, p, backend="dict", rng=None):
+    return graph_from_edges(n, gnp_edges(n, p, rng), backend)
 
 #Use the methods below to determine minimum vertex covers
 
-def add_to_each(sets, element):
-    copy = sets.copy()
-    for set in copy:
-        set.append(element)
-    return copy
-
+# Lazily yields every subset of the list as a new list, one at a time
 def power_set(set):
-    if set == []:
-        return [[]]
-    return power_set(set[1:]) + add_to_each(power_set(set[1:]), set[0])
-
-def is_vertex_cover(G, C):
+    for mask in all_subsets(len(set)):
+        yield [set[i] for i in iter_bits(mask)]
+
+# Validators take C/S as a collection of nodes, an int bitmask (bit v set when
+# v is in it) or a NumPy boolean mask of length n. Masks are checked a whole
+# neighbourhood at a time against G's bitmask adjacency, built on every call
+# unless it is passed as adj (bitset.adjacency_masks(G), which the caller must
+# rebuild after changing G); cover_check.py validates many candidates at once.
+@instrument.span
+def is_vertex_cover(G, C, adj=None):
+    if isinstance(C, int):
+        if adj is None:
+            adj = adjacency_masks(G)
+        # no node left out may have a neighbour that is also left out
+        rest = ((1 << len(adj)) - 1) & ~C
+        return all(adj[u] & rest == 0 for u in iter_bits(rest))
+    C = _node_set(C)
     for start in G.adj:
+        if start in C:
+            continue
         for end in G.adj[start]:
-            if not(start in C or end in C):
+            if end not in C:
                 return False
     return True
 
+def _node_set(nodes):
+    if hasattr(nodes, "dtype") and nodes.dtype == bool:
+        return set(nodes.nonzero()[0].tolist())
+    if isinstance(nodes, (set, frozenset)):
+        return nodes
+    return set(nodes)
+
 
+# Exact, branch and bound on bitmasks (see vc_exact.py)
+@instrument.span
 def MVC(G):
-    nodes = [i for i in range(G.get_size())]
-    subsets = power_set(nodes)
-    min_cover = nodes
-    for subset in subsets:
-        if is_vertex_cover(G, subset):
-            if len(subset) < len(min_cover):
-                min_cover = subset
-    return min_cover
-
-def is_independent_set(G, S):
+    return nodes_of(min_vertex_cover_mask(adjacency_masks(G)))
+
+@instrument.span
+def is_independent_set(G, S, adj=None):
+    if isinstance(S, int):
+        if adj is None:
+            adj = adjacency_masks(G)
+        return all(adj[u] & S == 0 for u in iter_bits(S))
+    S = _node_set(S)
     for node in S:
         for neighbor in G.adj[node]:
             if neighbor in S:
                 return False
     return True
 
+# The complement of a minimum vertex cover is a maximum independent set
+@instrument.span
 def MIS(G):
-    nodes = [i for i in range(G.get_size())]
-    subsets = power_set(nodes)
-    max_set = []
-    for subset in subsets:
-        if is_independent_set(G, subset):
-            if len(subset) > len(max_set):
-                max_set = subset
-    return max_set
-
-
-# Greedy algorithm
+    cover = min_vertex_cover_mask(adjacency_masks(G))
+    return [v for v in range(G.get_size()) if not cover >> v & 1]
+
+# Exhaustive versions, kept as a reference for checking MVC/MIS on small graphs.
+# Subsets are walked in Gray code order, so each differs from the last in one
+# node and the number of uncovered (or internal) edges is updated with a
+# single neighbourhood mask. Every subset is visited; among the best ones the
+# smallest mask wins, as it would in size order.
+@instrument.span
+def MVC_brute_force(G):
+    adj = adjacency_masks(G)
+    n = len(adj)
+    everything = (1 << n) - 1
+    uncovered = sum(popcount(adj[u] >> u) for u in range(n))  # every edge, at first
+    size = 0
+    best = (n + 1, 0)
+    for mask, node, added in gray_code_subsets(n):
+        if node is not None:
+            outside = everything & ~mask
+            if added:
+                size += 1
+                uncovered -= popcount(adj[node] & (outside | 1 << node))
+            else:
+                size -= 1
+                uncovered += popcount(adj[node] & outside)
+        if uncovered == 0 and (size, mask) < best:
+            best = (size, mask)
+    instrument.count("MVC_brute_force.subsets_evaluated", 1 << n)
+    return nodes_of(best[1])
+
+@instrument.span
+def MIS_brute_force(G):
+    adj = adjacency_masks(G)
+    n = len(adj)
+    inside = 0  # edges with both ends in the subset
+    size = 0
+    best = (1, 0)
+    for mask, node, added in gray_code_subsets(n):
+        if node is not None:
+            if added:
+                size += 1
+                inside += popcount(adj[node] & mask)
+            else:
+                size -= 1
+                inside -= popcount(adj[node] & (mask | 1 << node))
+        if inside == 0 and (-size, mask) < best:
+            best = (-size, mask)
+    instrument.count("MIS_brute_force.subsets_evaluated", 1 << n)
+    return nodes_of(best[1])
+
+
+# Greedy algorithm: repeatedly take the node covering the most uncovered
+# edges. Degrees live in a lazy-deletion max-heap and only the neighbours of
+# the chosen node are updated, so a run is O(m log n). Ties go to the lowest
+# node number.
+@instrument.span
 def approx1(G):
+    C = set()
+    degree = [0] * G.get_size()
+    loops = set()
+    for u in G.adj:
+        for v in G.adj[u]:
+            if u != v:
+                degree[u] += 1
+            else:
+                loops.add(u)
+    # a self loop can only be covered by its own node, so those go in first
+    for u in loops:
+        C.add(u)
+        degree[u] = 0
+    for u in loops:
+        for v in G.adj[u]:
+            if degree[v]:
+                degree[v] -= 1
+    
+    heap = [(-d, u) for u, d in enumerate(degree) if d]
+    heapq.heapify(heap)
+    pops = 0
+    while heap:
+        d, u = heapq.heappop(heap)
+        pops += 1
+        if -d != degree[u]:
+            continue  # stale entry, u was already taken or lost edges since
+        C.add(u)
+        degree[u] = 0
+        for v in G.adj[u]:
+            if degree[v] and v != u:
+                degree[v] -= 1
+                if degree[v]:
+                    heapq.heappush(heap, (-degree[v], v))
+    
+    if instrument.recorder is not None:
+        instrument.count("approx1.heap_pops", pops)
+        instrument.count("approx1.stale_pops", pops - len(C) + len(loops))
+    return C
+
+# The original O(n * m) greedy, kept as a reference so results produced
+# with it can be regenerated. Its ties follow CPython's iteration order of
+# the rebuilt edge set rather than node numbers, so on some graphs it picks
+# a different (sometimes larger or smaller) cover than approx1.
+@instrument.span
+def approx1_reference(G):
     C = set()
     edges = set()
     for u in G.adj:
         for v in G.adj[u]:
             if u < v:
                 edges.add((u, v))
-    
+
     while edges:
         degree = {}
         for (u, v) in edges:
             degree[u] = degree.get(u, 0) + 1
             degree[v] = degree.get(v, 0) + 1
-        
+
         max_vertex = max(degree, key=degree.get)
         C.add(max_vertex)
-        
+
         edges = {(u, v) for (u, v) in edges if u != max_vertex and v != max_vertex}
-    
+
     return C
 
+# Largest cover approx1 can return on any relabeling of the graph, found by
+# breaking every tie every possible way. Numbering the nodes in the order
+# they get picked makes approx1's lowest-number rule follow any such sequence,
+# so this is the exact worst case over all labelings.
+def approx1_worst_size(adj):
+    return _worst_greedy(tuple(row & ~(1 << v) for v, row in enumerate(adj)), {})
+
+def _worst_greedy(adj, memo):
+    if adj in memo:
+        return memo[adj]
+    degrees = [popcount(row) for row in adj]
+    top = max(degrees, default=0)
+    worst = 0
+    if top:
+        for v in range(len(adj)):
+            if degrees[v] == top:
+                rest = list(adj)
+                for u in iter_bits(adj[v]):
+                    rest[u] &= ~(1 << v)
+                rest[v] = 0
+                worst = max(worst, 1 + _worst_greedy(tuple(rest), memo))
+    memo[adj] = worst
+    return worst
+
+
+# Incrementally tracked vertex cover candidate. Adding or removing a node
+# costs O(deg(node)) and keeps
+#   uncovered  number of edges with neither endpoint in the cover
+#   free[v]    number of neighbours of v outside the cover, i.e. the edges v
+#              would cover if added, or uncover if removed
+# so heuristics and local search don't need to re-run is_vertex_cover.
+class CoverState:
+
+    def __init__(self, G, C=()):
+        self.G = G
+        n = G.get_size()
+        self.in_cover = [False] * n
+        self.free = [0] * n
+        self.loops = set()
+        self.size = 0
+        self.uncovered = 0
+        for u in G.adj:
+            for v in G.adj[u]:
+                if u < v:
+                    self.uncovered += 1
+                    self.free[u] += 1
+                    self.free[v] += 1
+                elif u == v and u not in self.loops:
+                    # a self loop can only be covered by u itself
+                    self.loops.add(u)
+                    self.uncovered += 1
+        for v in C:
+            self.add(v)
+
+    def add(self, v):
+        if self.in_cover[v]:
+            return
+        self.in_cover[v] = True
+        self.size += 1
+        for u in self.G.adj[v]:
+            if u != v:
+                self.free[u] -= 1
+                if not self.in_cover[u]:
+                    self.uncovered -= 1
+        if v in self.loops:
+            self.uncovered -= 1
+
+    def remove(self, v):
+        if not self.in_cover[v]:
+            return
+        self.in_cover[v] = False
+        self.size -= 1
+        for u in self.G.adj[v]:
+            if u != v:
+                self.free[u] += 1
+                if not self.in_cover[u]:
+                    self.uncovered += 1
+        if v in self.loops:
+            self.uncovered += 1
+
+    def is_cover(self):
+        return self.uncovered == 0
+
+    def cover(self):
+        return {v for v, taken in enumerate(self.in_cover) if taken}
+
+
+# CoverState with a weight on every edge (1 to start with), for local search
+# that steers by edge weights (see local_search.py). Also keeps
+#   edges            every edge (u, v) with u < v; e is its index here
+#   incident[v]      (e, other end) for every edge at v
+#   weight[e]        weight of edge e, total_weight their sum
+#   score[v]         weight of the edges v would cover if added (v outside
+#                    the cover), or minus the weight it would uncover if
+#                    removed (v in the cover); free[v] with weights and a sign
+#   uncovered_edges  the uncovered edges, in no particular order
+# Self loops are not numbered edges, they only count in uncovered. Every
+# node whose score a move changes is passed to _score_changed, for
+# subclasses that keep an index on scores.
+class WeightedCoverState(CoverState):
+
+    def __init__(self, G, C=()):
+        n = G.get_size()
+        self.edges = []
+        self.incident = [[] for _ in range(n)]
+        for u in G.adj:
+            for v in G.adj[u]:
+                if u < v:
+                    self.incident[u].append((len(self.edges), v))
+                    self.incident[v].append((len(self.edges), u))
+                    self.edges.append((u, v))
+        self.weight = [1] * len(self.edges)
+        self.total_weight = len(self.edges)
+        self.score = [len(row) for row in self.incident]
+        self.uncovered_edges = list(range(len(self.edges)))
+        self._slot = list(range(len(self.edges)))  # e -> its index in uncovered_edges
+        super().__init__(G, C)
+
+    def add(self, v):
+        if self.in_cover[v]:
+            return
+        super().add(v)
+        self.score[v] = -self.score[v]
+        for e, u in self.incident[v]:
+            if self.in_cover[u]:
+                self.score[u] += self.weight[e]  # u no longer covers e alone
+            else:
+                self.score[u] -= self.weight[e]
+                k = self._slot[e]
+                last = self.uncovered_edges.pop()
+                if last != e:
+                    self.uncovered_edges[k] = last
+                    self._slot[last] = k
+            self._score_changed(u)
+
+    def remove(self, v):
+        if not self.in_cover[v]:
+            return
+        super().remove(v)
+        self.score[v] = -self.score[v]
+        for e, u in self.incident[v]:
+            if self.in_cover[u]:
+                self.score[u] -= self.weight[e]  # now u covers e alone
+            else:
+                self.score[u] += self.weight[e]
+                self._slot[e] = len(self.uncovered_edges)
+                self.uncovered_edges.append(e)
+            self._score_changed(u)
+
+    def _score_changed(self, v):
+        pass
+
+    # one more unit of weight on every uncovered edge (both its ends are
+    # outside the cover, so their scores go up)
+    def bump_uncovered(self):
+        for e in self.uncovered_edges:
+            self.weight[e] += 1
+            a, b = self.edges[e]
+            self.score[a] += 1
+            self.score[b] += 1
+        self.total_weight += len(self.uncovered_edges)
+
+    # every weight scaled by factor (at least 1 each), scores recomputed
+    def scale_weights(self, factor):
+        self.weight = [int(factor * w) or 1 for w in self.weight]
+        self.total_weight = sum(self.weight)
+        self.score = [0] * len(self.score)
+        for e, (a, b) in enumerate(self.edges):
+            w = self.weight[e]
+            if self.in_cover[a] and not self.in_cover[b]:
+                self.score[a] -= w
+            elif self.in_cover[b] and not self.in_cover[a]:
+                self.score[b] -= w
+            elif not self.in_cover[a]:
+                self.score[a] += w
+                self.score[b] += w
+
+
 # Bad random algorithm
-def approx2(G):
-    C = set()
+@instrument.span
+def approx2(G, rng=None):
+    state = CoverState(G)
     nodes = list(G.adj.keys())
-    random.shuffle(nodes)
+    (rng or random).shuffle(nodes)
     
     for v in nodes:
-        C.add(v)
-        if is_vertex_cover(G, C):
-            return C
+        state.add(v)
+        if state.is_cover():
+            break
     
-    return C
+    instrument.count("approx2.nodes_added", state.size)
+    return state.cover()
 
 
 # Much better random algorithm :)
-def approx3(G):
+# Walks the edges once in random order and takes both endpoints of every edge
+# that is still uncovered. The first uncovered edge of a random order is a
+# uniform pick among the uncovered edges, so the covers come out with the same
+# distribution as picking random edges one at a time, but in O(m). rng can be
+# a random.Random or numpy Generator for reproducible runs.
+@instrument.span
+def approx3(G, rng=None):
     C = set()
     edges = []
     for u in G.adj:
         for v in G.adj[u]:
             if u < v:
                 edges.append((u, v))
+            elif u == v:
+                C.add(u)  # a self loop can only be covered by u itself
     
-    while edges:
-        (u, v) = random.choice(edges)
-        C.add(u)
-        C.add(v)
-        
-        edges = [(a, b) for (a, b) in edges if a != u and a != v and b != u and b != v]
+    (rng or random).shuffle(edges)
+    for (u, v) in edges:
+        if u not in C and v not in C:
+            C.add(u)
+            C.add(v)
     
+    instrument.count("approx3.edges_scanned", len(edges))
     return C
 
 
@@ -0,0 +1,135 @@
+# Binary files for graphs, read back through numpy.memmap so opening one is
+# instant however big it is, and processes that open the same file share its
+# pages.
+#
+# Single graph (save_graph / load_graph): a 64 byte header then the CSR arrays
+# of CSRGraph, each starting on an 8 byte boundary.
+#   magic "GRPHCSR\0", version, flags (bit 0: rows sorted), n, len(indices),
+#   itemsize of indices (4 or 8); indptr is always int64
+#
+# Batch (save_batch / GraphBatch): many small graphs in one file, e.g. the
+# trial graphs of an experiment, stored as edge lists.
+#   magic "GRPHBAT\0", version, flags (none yet), count, total edges,
+#   itemsize of node numbers (1, 2 or 4), then nodes[count] (uint32),
+#   offsets[count + 1] (uint64, the edges of graph k are rows
+#   offsets[k]:offsets[k + 1]) and edges[total, 2]
+#
+# All integers are little endian.
+import struct
+import numpy as np
+from graph import CSRGraph, graph_from_edges
+
+VERSION = 1
+_GRAPH_MAGIC = b"GRPHCSR\0"
+_BATCH_MAGIC = b"GRPHBAT\0"
+_HEADER = struct.Struct("<8sIIQQI")
+_HEADER_SIZE = 64
+_SORTED = 1
+
+
+def _pad(offset):
+    return -offset % 8
+
+
+def _read_header(path, magic):
+    with open(path, "rb") as f:
+        raw = f.read(_HEADER_SIZE)
+    if len(raw) < _HEADER_SIZE or raw[:8] != magic:
+        raise ValueError(f"{path} is not a {magic[:7].decode()} file")
+    fields = _HEADER.unpack_from(raw)
+    if fields[1] > VERSION:
+        raise ValueError(f"{path} is format version {fields[1]}, newer than this reader ({VERSION})")
+    return fields[1:]
+
+
+def _array(path, dtype, offset, count, mmap):
+    if count == 0:
+        return np.zeros(0, dtype=dtype)
+    if mmap:
+        return np.memmap(path, dtype=dtype, mode=mmap, offset=offset, shape=(count,))
+    return np.fromfile(path, dtype=dtype, count=count, offset=offset)
+
+
+# G can be a Graph or a CSRGraph
+def save_graph(G, path):
+    if not isinstance(G, CSRGraph):
+        G = CSRGraph.from_graph(G)
+    n = G.get_size()
+    indptr = np.asarray(G.indptr, dtype="<i8")
+    indices = np.asarray(G.indices)
+    itemsize = 4 if n < 2 ** 31 else 8
+    indices = indices.astype(f"<i{itemsize}", copy=False)
+    flags = _SORTED if G.index == "sorted" else 0
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_GRAPH_MAGIC, VERSION, flags, n, len(indices), itemsize).ljust(_HEADER_SIZE, b"\0"))
+        f.write(indptr.tobytes())
+        f.write(indices.tobytes())
+        f.write(bytes(_pad(indices.nbytes)))
+
+
+# Returns a read-only CSRGraph whose arrays are memory-mapped from path
+# (mmap=False reads them into memory instead). A file with unsorted rows is
+# mapped copy-on-write when index="sorted", so sorting them never touches it.
+def load_graph(path, index="sorted", mmap=True):
+    _, flags, n, nnz, itemsize = _read_header(path, _GRAPH_MAGIC)
+    presorted = bool(flags & _SORTED)
+    mode = ("r" if presorted or index != "sorted" else "c") if mmap else None
+    indptr = _array(path, "<i8", _HEADER_SIZE, n + 1, mode)
+    indices = _array(path, f"<i{itemsize}", _HEADER_SIZE + 8 * (n + 1), nnz, mode)
+    return CSRGraph(indptr, indices, index, assume_sorted=presorted)
+
+
+def _edge_list(G):
+    # each edge once, smaller endpoint first (a self loop sits twice in its row)
+    return sorted({(u, v) if u <= v else (v, u) for u in G.adj for v in G.adj[u]})
+
+
+def save_batch(graphs, path):
+    nodes = []
+    offsets = [0]
+    edges = []
+    for G in graphs:
+        nodes.append(G.get_size())
+        edges.extend(_edge_list(G))
+        offsets.append(len(edges))
+    largest = max(nodes, default=0)
+    itemsize = 1 if largest <= 2 ** 8 else 2 if largest <= 2 ** 16 else 4
+    edge_array = np.array(edges, dtype=f"<u{itemsize}").reshape(-1, 2)
+    with open(path, "wb") as f:
+        f.write(_HEADER.pack(_BATCH_MAGIC, VERSION, 0, len(nodes), len(edges), itemsize).ljust(_HEADER_SIZE, b"\0"))
+        for block in (np.array(nodes, dtype="<u4"), np.array(offsets, dtype="<u8"), edge_array):
+            f.write(block.tobytes())
+            f.write(bytes(_pad(block.nbytes)))
+
+
+# Memory-mapped view of a file written by save_batch. batch[k] builds graph k
+# (backend as in graph_from_edges); batch.edges(k) is its (m, 2) edge array
+# straight from the mapping, with no parsing at all.
+class GraphBatch:
+
+    def __init__(self, path, mmap=True):
+        _, _, count, total, itemsize = _read_header(path, _BATCH_MAGIC)
+        mode = "r" if mmap else None
+        offset = _HEADER_SIZE
+        self.nodes = _array(path, "<u4", offset, count, mode)
+        offset += 4 * count + _pad(4 * count)
+        self.offsets = _array(path, "<u8", offset, count + 1, mode)
+        offset += 8 * (count + 1)
+        self.edge_array = _array(path, f"<u{itemsize}", offset, 2 * total, mode).reshape(-1, 2)
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def edges(self, k):
+        return self.edge_array[self.offsets[k]:self.offsets[k + 1]]
+
+    def graph(self, k, backend="dict"):
+        return graph_from_edges(int(self.nodes[k]), self.edges(k).tolist(), backend)
+
+    def __getitem__(self, k):
+        if not 0 <= k < len(self):
+            raise IndexError(k)
+        return self.graph(k)
+
+    def __iter__(self):
+        return (self.graph(k) for k in range(len(self)))
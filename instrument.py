@@ -0,0 +1,167 @@
+# Opt-in instrumentation for graph.py: operation counters (nodes visited,
+# edges scanned, search nodes, ...) and a timing span for every call to an
+# instrumented function.
+#
+#   with instrument.recording() as rec:
+#       MVC(G)
+#   rec.to_dict()          # {'counters': {...}, 'spans': {...}}, JSON ready
+#   pstats.Stats(rec)      # or rec.dump_stats(path), same format as cProfile
+#
+# Setting GRAPH_INSTRUMENT records the whole process instead: =1 prints the
+# top spans at exit, =path.json or =path.prof writes them there.
+#
+# While nothing is recording `recorder` is None, and an instrumented function
+# costs one extra call and a None check.
+import atexit
+import functools
+import json
+import marshal
+import os
+import pstats
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+recorder = None
+
+
+class Recorder:
+
+    def __init__(self, allocations=False):
+        self.allocations = allocations
+        self.counters = {}
+        # (file, line, name) -> [primitive calls, calls, own time, total time,
+        #                         callers, net bytes allocated]
+        self.spans = {}
+        self.stats = {}
+        self._stack = []  # [key, time spent in nested spans]
+
+    def count(self, name, k=1):
+        self.counters[name] = self.counters.get(name, 0) + k
+
+    def call(self, fn, args, kwargs):
+        code = fn.__code__
+        key = (code.co_filename, code.co_firstlineno, fn.__name__)
+        frame = [key, 0.0]
+        self._stack.append(frame)
+        before = tracemalloc.get_traced_memory()[0] if self.allocations else 0
+        start = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            self._stack.pop()
+            own = elapsed - frame[1]
+            # like cProfile, time inside a recursive call is only counted
+            # towards the outermost one
+            primitive = all(f[0] != key for f in self._stack)
+            entry = self.spans.get(key)
+            if entry is None:
+                entry = self.spans[key] = [0, 0, 0.0, 0.0, {}, 0]
+            entry[0] += primitive
+            entry[1] += 1
+            entry[2] += own
+            if primitive:
+                entry[3] += elapsed
+            if self.allocations:
+                entry[5] += tracemalloc.get_traced_memory()[0] - before
+            if self._stack:
+                parent = self._stack[-1]
+                parent[1] += elapsed
+                edge = entry[4].setdefault(parent[0], [0, 0, 0.0, 0.0])
+                edge[0] += 1
+                edge[1] += primitive
+                edge[2] += own
+                edge[3] += elapsed if primitive else 0.0
+
+    def to_dict(self):
+        spans = {}
+        for (filename, _, name), entry in self.spans.items():
+            module = os.path.splitext(os.path.basename(filename))[0]
+            span = {'calls': entry[1], 'total_s': entry[3], 'own_s': entry[2]}
+            if self.allocations:
+                span['alloc_bytes'] = entry[5]
+            spans[f"{module}.{name}"] = span
+        return {'counters': dict(sorted(self.counters.items())), 'spans': spans}
+
+    def to_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    # pstats.Stats(recorder) calls this and takes self.stats
+    def create_stats(self):
+        self.stats = {key: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers.items()})
+                      for key, (cc, nc, tt, ct, callers, _) in self.spans.items()}
+
+    # the marshal format of cProfile.Profile.dump_stats, readable by pstats,
+    # snakeviz and friends
+    def dump_stats(self, path):
+        self.create_stats()
+        with open(path, "wb") as f:
+            marshal.dump(self.stats, f)
+
+
+def span(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        rec = recorder
+        if rec is None:
+            return fn(*args, **kwargs)
+        return rec.call(fn, args, kwargs)
+    return wrapper
+
+
+def count(name, k=1):
+    if recorder is not None:
+        recorder.count(name, k)
+
+
+# allocations=True also traces memory (slow) and gives each span the net
+# number of bytes its calls left allocated
+@contextmanager
+def recording(allocations=False):
+    global recorder
+    previous = recorder
+    rec = Recorder(allocations)
+    started = allocations and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    recorder = rec
+    try:
+        yield rec
+    finally:
+        recorder = previous
+        if started:
+            tracemalloc.stop()
+
+
+def save(rec, path):
+    # .prof gets cProfile stats, anything else JSON
+    if path.endswith(".prof"):
+        rec.dump_stats(path)
+    else:
+        rec.to_json(path)
+
+
+def _report_at_exit(rec, target):
+    if target == "1":
+        pstats.Stats(rec, stream=sys.stderr).sort_stats("cumulative").print_stats(20)
+        for name, value in sorted(rec.counters.items()):
+            print(f"{name:>40} {value:>14}", file=sys.stderr)
+    else:
+        save(rec, target)
+
+
+# Records everything from here until the process exits, then reports to
+# target ("1" prints a summary, otherwise a path as in save). Work done in
+# worker processes is not included.
+def record_to(target):
+    global recorder
+    recorder = Recorder()
+    atexit.register(_report_at_exit, recorder, target)
+    return recorder
+
+
+if os.environ.get("GRAPH_INSTRUMENT"):
+    record_to(os.environ["GRAPH_INSTRUMENT"])
@@ -0,0 +1,160 @@
+# Anytime vertex cover by local search, in the style of NuMVC (Cai et al.,
+# 2013).
+#
+# Start from a cover (approx1's by default). Whenever the current candidate
+# C covers every edge, remember it and drop a node to look for a cover of
+# one size less. Otherwise swap: remove the node of C whose removal uncovers
+# the least edge weight, then add an endpoint of a random uncovered edge.
+# After every swap each still uncovered edge gets heavier, so edges that keep
+# getting left out pull the search towards covers that include them.
+# Weights are scaled down once their average gets large so that old history
+# is forgotten.
+#
+# Configuration checking: a node that left C may only come back once one of
+# its neighbours has changed state since, which stops the search from
+# undoing its last move straight away.
+#
+# Edge weights, scores and the uncovered edges are kept by
+# graph.WeightedCoverState, in O(deg(v)) per move. Nodes of C sit in a
+# lazy-deletion heap by (-score, age), so the best removal costs O(log n).
+import heapq
+import random
+import time
+from graph import WeightedCoverState, approx1, approx3
+
+# Forget weights once their average exceeds GAMMA, scaling them by RHO.
+# NuMVC's threshold of 0.5 * n suits graphs of a few thousand nodes; on big
+# sparse graphs it is never reached, and the uncovered edges pile up.
+GAMMA = 2.0
+RHO = 0.3
+
+
+class _Search(WeightedCoverState):
+
+    def __init__(self, G, cover, rng):
+        self.rng = rng
+        n = G.get_size()
+        self.age = [0] * n  # step at which the node last changed state
+        self.allowed = [True] * n  # configuration checking
+        self.members = []  # nodes of C, with position[v] its index there
+        self.position = [-1] * n
+        self.heap = []  # (-score, age, v) for nodes of C, stale entries skipped
+        self.step = 0
+        super().__init__(G, cover)
+        for v in self.loops:
+            self.add(v)  # a self loop can only be covered by its own node
+
+    def add(self, v):
+        if self.in_cover[v]:
+            return
+        super().add(v)
+        self.position[v] = len(self.members)
+        self.members.append(v)
+        self.age[v] = self.step
+        self._push(v)
+
+    def remove(self, v):
+        if not self.in_cover[v]:
+            return
+        super().remove(v)
+        last = self.members.pop()
+        if last != v:
+            self.members[self.position[v]] = last
+            self.position[last] = self.position[v]
+        self.position[v] = -1
+        self.allowed[v] = False
+        self.age[v] = self.step
+
+    def _score_changed(self, u):
+        self.allowed[u] = True  # a neighbour changed state
+        if self.in_cover[u]:
+            self._push(u)
+
+    def _better(self, a, b):
+        # higher score wins, then the node that has been unchanged longest
+        return self.score[a] > self.score[b] or (self.score[a] == self.score[b] and self.age[a] < self.age[b])
+
+    def _push(self, v):
+        if v not in self.loops:
+            heapq.heappush(self.heap, (-self.score[v], self.age[v], v))
+
+    def best_removal(self):
+        # highest score in C, oldest first among equals; None if only
+        # self loop nodes are left
+        heap = self.heap
+        while heap:
+            negative, age, v = heapq.heappop(heap)
+            if self.in_cover[v] and -negative == self.score[v] and age == self.age[v]:
+                return v
+        return None
+
+    def swap(self):
+        self.step += 1
+        u = self.best_removal()
+        if u is None:
+            return
+        self.remove(u)
+        e = self.uncovered_edges[self.rng.randrange(len(self.uncovered_edges))]
+        a, b = self.edges[e]
+        if not self.allowed[a]:
+            v = b
+        elif not self.allowed[b]:
+            v = a
+        else:
+            v = a if self._better(a, b) else b
+        self.add(v)
+        self.bump_uncovered()
+        if self.total_weight > GAMMA * len(self.edges):
+            self.scale_weights(RHO)
+            self._rebuild_heap()
+        elif len(self.heap) > 4 * len(self.members) + 64:
+            self._rebuild_heap()  # mostly stale entries by now
+
+    def _rebuild_heap(self):
+        self.heap = [(-self.score[v], self.age[v], v) for v in self.members if v not in self.loops]
+        heapq.heapify(self.heap)
+
+
+# Returns (cover, trace): the smallest cover found as a set, and one
+# (seconds, step, size) entry for the start and every improvement after it.
+# Stops after max_steps swaps or time_limit seconds, whichever comes first
+# (at least one of them must be given), or as soon as a cover of at most
+# target nodes is found, e.g. a known optimum or lower bound. start is
+# "approx1", "approx3" or a cover to begin from; rng is a random.Random or
+# None for the global random module.
+def local_search_cover(G, time_limit=None, max_steps=None, start="approx1", rng=None, target=None):
+    if time_limit is None and max_steps is None:
+        raise ValueError("local search needs a time_limit or max_steps")
+    rng = rng or random
+    began = time.perf_counter()
+    if start == "approx1":
+        start = approx1(G)
+    elif start == "approx3":
+        start = approx3(G, rng)
+    search = _Search(G, start, rng)
+    for v in list(search.members):
+        if search.score[v] == 0 and v not in search.loops:
+            search.remove(v)  # redundant, all its edges are covered twice
+
+    best = set(search.members)
+    trace = [(time.perf_counter() - began, 0, len(best))]
+    while max_steps is None or search.step < max_steps:
+        while search.is_cover():
+            if len(search.members) < len(best):
+                best = set(search.members)
+                trace.append((time.perf_counter() - began, search.step, len(best)))
+            if target is not None and len(best) <= target:
+                return best, trace
+            v = search.best_removal()
+            if v is None:
+                return best, trace  # only self loop nodes left, nothing to improve
+            search.remove(v)
+        if time_limit is not None and search.step % 64 == 0 and time.perf_counter() - began >= time_limit:
+            break
+        search.swap()
+    return best, trace
+
+
+# Just the cover, for use next to approx1-3
+def approx4(G, max_steps=1000, time_limit=None, rng=None, target=None):
+    return local_search_cover(G, time_limit, max_steps, rng=rng, target=target)[0]
@@ -0,0 +1,94 @@
+# Append-only store of experiment results, one JSON object per line, so a
+# long run that dies partway keeps everything it finished.
+#
+# A result is keyed by (experiment, n, edges, seed, trial) and holds the
+# values of `count` trials starting at trial number `trial` (the trial runner
+# records a whole chunk at a time, see trials.py). Writing the same key again
+# replaces the old record when the file is next loaded, so a chunk that is
+# rerun with a different count simply supersedes it.
+#
+# Minimum vertex covers found through an MVCMemo that was given the store
+# (see canonical.py) are recorded as well, keyed by canonical form, so every
+# script pointed at the same file solves each isomorphism class once.
+#
+# Every record is written with a single write() on a file opened for
+# appending, so worker processes can add to the same store, and a last line
+# cut short by a crash is ignored when loading.
+import json
+import os
+from trials import merge_totals
+
+
+class ResultStore:
+
+    def __init__(self, path):
+        self.path = path
+        self.results = {}  # (experiment, n, edges, seed, trial) -> (count, values)
+        self.optima = {}  # (n, canonical code) -> cover mask over canonical positions
+        if os.path.exists(path):
+            with open(path) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # half written
+                    self._load(record)
+
+    def _load(self, record):
+        if "optimum" in record:
+            n, code = record["optimum"]
+            self.optima[n, code] = record["cover"]
+        else:
+            key = (record["experiment"], record["n"], record["edges"], record["seed"], record["trial"])
+            self.results[key] = (record["count"], record["values"])
+
+    def _append(self, record):
+        with open(self.path, "a") as f:
+            f.write(json.dumps(record) + "\n")
+
+    def __len__(self):
+        return len(self.results)
+
+    # values recorded for the key, or None if there are none (or they cover a
+    # different number of trials than count)
+    def get(self, experiment, n, edges, seed, trial, count=None):
+        entry = self.results.get((experiment, n, edges, seed, trial))
+        if entry is None or (count is not None and entry[0] != count):
+            return None
+        return entry[1]
+
+    def add(self, experiment, n, edges, seed, trial, values, count=1):
+        record = {"experiment": experiment, "n": n, "edges": edges, "seed": seed,
+                  "trial": trial, "count": count, "values": values}
+        self._append(record)
+        self._load(record)
+
+    def add_optimum(self, key, cover):
+        n, code = key
+        self._append({"optimum": [n, code], "cover": cover})
+        self.optima[n, code] = cover
+
+    # (trial, count, values) for one config, in trial order
+    def trials(self, experiment, n, edges, seed):
+        found = [(key[4], count, values) for key, (count, values) in self.results.items()
+                 if key[:4] == (experiment, n, edges, seed)]
+        return sorted(found, key=lambda entry: entry[0])
+
+    # Sum of the recorded values of trials 0..runs-1 (all recorded trials with
+    # runs=None), merged in trial order like run_trial_grid does. Returns
+    # (totals, trials): trials is how many were found, which is less than
+    # runs if the run that recorded them was cut short.
+    def totals(self, experiment, n, edges, seed, runs=None):
+        totals = {}
+        found = 0
+        for trial, count, values in self.trials(experiment, n, edges, seed):
+            if trial != found or (runs is not None and trial + count > runs):
+                break  # a gap, or past the runs asked for
+            merge_totals(totals, values)
+            found += count
+        return totals, found
+
+    # sorted (n, edges) pairs with results for the experiment and seed
+    def configs(self, experiment, seed):
+        return sorted({key[1:3] for key in self.results if key[0] == experiment and key[3] == seed},
+                      key=lambda config: (config[0], -1 if config[1] is None else config[1]))
@@ -0,0 +1,47 @@
+# Lazy subset enumeration over nodes 0..n-1. Subsets are yielded as int
+# bitmasks (bit v set means node v is in the subset), so memory stays
+# constant no matter how large n gets. Use bitset.nodes_of to turn a mask
+# back into a list when needed.
+
+
+def all_subsets(n):
+    # every subset, in plain binary counting order
+    return iter(range(1 << n))
+
+
+def subsets_of_size(n, k):
+    # every subset with exactly k nodes, in increasing mask order
+    if k < 0 or k > n:
+        return
+    if k == 0:
+        yield 0
+        return
+    mask = (1 << k) - 1
+    limit = 1 << n
+    while mask < limit:
+        yield mask
+        # Gosper's hack: next larger int with the same number of set bits
+        low = mask & -mask
+        ripple = mask + low
+        mask = ripple | (((mask ^ ripple) >> 2) // low)
+
+
+def subsets_by_size(n, smallest_first=True):
+    # every subset, grouped by size
+    sizes = range(n + 1) if smallest_first else range(n, -1, -1)
+    for k in sizes:
+        yield from subsets_of_size(n, k)
+
+
+def gray_code_subsets(n):
+    # every subset in Gray code order, each one differing from the previous
+    # in exactly one node. Yields (mask, node, added) where node is the one
+    # that was toggled (None for the empty start set) and added tells
+    # whether it joined or left, so a caller can update its checks in
+    # O(deg(node)) instead of re-testing the whole subset.
+    mask = 0
+    yield mask, None, False
+    for i in range(1, 1 << n):
+        node = (i & -i).bit_length() - 1
+        mask ^= 1 << node
+        yield mask, node, bool(mask >> node & 1)
@@ -0,0 +1,140 @@
+import itertools
+import random
+import pytest
+from bitset import adjacency_masks, iter_bits, mask_of
+from canonical import canonical_form, nonisomorphic_graphs, relabel
+from edge_list import read_edge_list
+from graph import (Graph, create_random_graph, MVC, MIS, MVC_brute_force, MIS_brute_force,
+                   approx1, approx1_reference, approx2, approx3, is_vertex_cover, is_independent_set)
+from graph_file import load_graph, save_graph
+from local_search import approx4
+
+
+def random_graphs(count, max_nodes, seed, loops=False):
+    rng = random.Random(seed)
+    for _ in range(count):
+        n = rng.randint(1, max_nodes)
+        G = create_random_graph(n, rng.randint(0, n * (n - 1) // 2), rng=rng)
+        if loops:
+            for _ in range(rng.randint(1, 3)):
+                v = rng.randrange(n)
+                G.add_edge(v, v)
+        yield G
+
+
+def max_clique_size(adj):
+    # Bron-Kerbosch with pivoting on bitmask adjacency (no self loops)
+    best = 0
+    def expand(size, candidates, excluded):
+        nonlocal best
+        if not candidates and not excluded:
+            best = max(best, size)
+            return
+        pivot = max(iter_bits(candidates | excluded), key=lambda u: bin(adj[u] & candidates).count("1"))
+        for v in iter_bits(candidates & ~adj[pivot]):
+            expand(size + 1, candidates & adj[v], excluded & adj[v])
+            candidates &= ~(1 << v)
+            excluded |= 1 << v
+    expand(0, (1 << len(adj)) - 1, 0)
+    return best
+
+
+def edge_set(G):
+    return {(u, v) for u in G.adj for v in G.adj[u]}
+
+
+@pytest.mark.parametrize("loops", [False, True])
+def test_exact_solvers_match_brute_force(loops):
+    for G in random_graphs(150, 10, seed=1 + loops, loops=loops):
+        cover, independent = MVC(G), MIS(G)
+        assert is_vertex_cover(G, cover) and is_independent_set(G, independent)
+        assert len(cover) == len(MVC_brute_force(G))
+        assert len(independent) == len(MIS_brute_force(G))
+        assert is_vertex_cover(G, MVC_brute_force(G)) and is_independent_set(G, MIS_brute_force(G))
+
+
+def test_mis_matches_max_clique_of_complement():
+    rng = random.Random(3)
+    for n in (20, 30, 40):
+        for _ in range(3):
+            G = create_random_graph(n, rng.randint(n, 3 * n), rng=rng)
+            everything = (1 << n) - 1
+            complement = [everything & ~a & ~(1 << v) for v, a in enumerate(adjacency_masks(G))]
+            assert len(MIS(G)) == max_clique_size(complement)
+            assert len(MVC(G)) == n - max_clique_size(complement)
+
+
+@pytest.mark.parametrize("loops", [False, True])
+def test_approximations_return_covers(loops):
+    rng = random.Random(5)
+    for G in random_graphs(100, 12, seed=4 + loops, loops=loops):
+        covers = [approx1(G), approx2(G, rng), approx3(G, rng), approx4(G, max_steps=50, rng=rng)]
+        if not loops:
+            covers.append(approx1_reference(G))  # the original, which ignores self loops
+        for cover in covers:
+            assert is_vertex_cover(G, cover)
+
+
+def test_validators_see_direct_edits():
+    G = Graph(3)
+    G.add_edge(0, 1)
+    assert is_vertex_cover(G, [0]) and is_vertex_cover(G, mask_of([0]))
+    G.adj[1].append(2)
+    G.adj[2].append(1)
+    assert not is_vertex_cover(G, [0]) and not is_vertex_cover(G, mask_of([0]))
+    assert len(MVC(G)) == 1 and len(MIS(G)) == 2
+
+
+def test_canonical_form_is_invariant_under_relabeling():
+    rng = random.Random(6)
+    for G in random_graphs(100, 9, seed=7, loops=True):
+        adj = adjacency_masks(G)
+        code, order = canonical_form(adj)
+        assert canonical_form(relabel(adj, order))[0] == code
+        perm = list(range(len(adj)))
+        rng.shuffle(perm)
+        assert canonical_form(relabel(adj, perm))[0] == code
+
+
+def test_nonisomorphic_graphs_counts():
+    # 11 classes on 4 nodes, 34 on 5, covering every labeled graph
+    for n, classes in ((4, 11), (5, 34)):
+        found = list(nonisomorphic_graphs(n))
+        assert len(found) == classes
+        assert len({canonical_form(adj)[0] for adj, _ in found}) == classes
+        assert sum(labeled for _, labeled in found) == 2 ** (n * (n - 1) // 2)
+
+
+def test_graph_file_roundtrip(tmp_path):
+    for k, G in enumerate(random_graphs(10, 30, seed=8, loops=True)):
+        path = tmp_path / f"g{k}.bin"
+        save_graph(G, path)
+        for mmap in (True, False):
+            H = load_graph(path, mmap=mmap)
+            assert H.get_size() == G.get_size()
+            assert edge_set(H) == edge_set(G)
+
+
+def test_read_edge_list(tmp_path):
+    path = tmp_path / "edges.txt"
+    path.write_text("# comment\n10 20\n20 10\n20 30\n10 20\n40 40\n")
+    G, labels, stats = read_edge_list(path)
+    assert list(labels) == [10, 20, 30, 40]
+    assert edge_set(G) == {(0, 1), (1, 0), (1, 2), (2, 1), (3, 3)}
+    assert stats['edges_read'] == 5
+
+    path = tmp_path / "edges.csv"
+    path.write_text("b,a\nc,b\n")
+    G, labels, _ = read_edge_list(path, numeric=False)
+    assert list(labels) == ["a", "b", "c"]
+    assert edge_set(G) == {(0, 1), (1, 0), (1, 2), (2, 1)}
+
+
+def test_read_edge_list_across_chunks(tmp_path):
+    rng = random.Random(9)
+    edges = [(rng.randrange(500), rng.randrange(500)) for _ in range(3000)]
+    path = tmp_path / "edges.txt"
+    path.write_text("".join(f"{u} {v}\n" for u, v in edges))
+    G, _, _ = read_edge_list(path, relabel=False, chunk_bytes=1000)
+    expected = set(itertools.chain.from_iterable(((u, v), (v, u)) for u, v in edges))
+    assert edge_set(G) == expected
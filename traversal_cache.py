@@ -0,0 +1,60 @@
+# Per-graph LRU cache of traversal results (BFS/DFS predecessor trees by
+# source, component labels), bounded by an estimate of their memory use.
+#
+# Entries are only valid for the graph version they were computed on: Graph
+# bumps G.version on every add_node/add_edge, and the cache drops everything
+# the first time it sees a newer version.
+import sys
+from collections import OrderedDict
+
+
+class TraversalCache:
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()  # key -> (value, size)
+        self.bytes = 0
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, G, key):
+        self._check_version(G)
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, G, key, value):
+        self._check_version(G)
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self.bytes -= self.entries.pop(key)[1]
+        self.entries[key] = (value, size)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            _, (_, old_size) = self.entries.popitem(last=False)
+            self.bytes -= old_size
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+
+    def _check_version(self, G):
+        if self.version != G.version:
+            self.clear()
+            self.version = G.version
+
+
+def _estimate_size(value):
+    # container overhead only: the small ints inside are shared by Python
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_estimate_size(v) for v in value)
+    if hasattr(value, "__dict__"):
+        return sys.getsizeof(value) + sum(_estimate_size(v) for v in vars(value).values())
+    return sys.getsizeof(value)
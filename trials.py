@@ -0,0 +1,91 @@
+# Runs experiment trials in chunks, optionally across worker processes.
+#
+# A trial is a module level function (so it can be sent to a worker) that
+# takes the config args and returns a dict of numbers to add up, or None to
+# skip the trial. Each chunk of trials gets its own random stream spawned
+# from a SeedSequence and seeds the global random module with it, so code
+# that uses random (create_random_graph, approx2, approx3, ...) is
+# reproducible. Chunk boundaries and streams depend only on the seed and the
+# config (its key (experiment, n, edges) when given, so the stream is
+# seeded by (seed, n, edges), else its position in the grid), and chunk
+# totals are merged in chunk order, so a given seed gives bit-identical
+# results for any number of workers. Only the per-chunk totals come back from
+# the workers, never the graphs.
+#
+# Given a result store (result_store.py), run_trial_grid records every chunk
+# as soon as it finishes and reads back the chunks already recorded instead
+# of running them again. Chunk streams do not depend on how many chunks
+# there are or on the rest of the grid, so a resumed grid, one rerun with
+# more runs, or one with configs added or dropped gives the same totals as a
+# single uninterrupted run.
+import random
+from concurrent.futures import ProcessPoolExecutor
+from numpy.random import SeedSequence
+
+CHUNK_SIZE = 50
+
+
+def iter_map(fn, tasks, workers=1):
+    # fn(*task) for every task, yielded in task order as they complete
+    if workers <= 1 or not tasks:
+        for task in tasks:
+            yield fn(*task)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(fn, *zip(*tasks))
+
+
+def parallel_map(fn, tasks, workers=1):
+    return list(iter_map(fn, tasks, workers))
+
+
+def merge_totals(totals, more):
+    for key, value in more.items():
+        totals[key] = totals.get(key, 0) + value
+    return totals
+
+
+def run_trial_grid(trial, configs, runs, seed=0, workers=1, chunk_size=CHUNK_SIZE, store=None, keys=None):
+    # runs trials of trial(*args) for every args in configs, returns one
+    # totals dict per config. Note this reseeds the global random module.
+    # keys[c] = (experiment, n, edges) names config c, in the store if given.
+    chunk_totals = [[] for _ in configs]
+    tasks = []
+    owners = []
+    for c, args in enumerate(configs):
+        chunks = (runs + chunk_size - 1) // chunk_size
+        entropy = [seed, *keys[c][1:]] if keys is not None else [seed, c]
+        streams = SeedSequence(entropy).spawn(chunks)
+        for k, stream in enumerate(streams):
+            count = min(chunk_size, runs - k * chunk_size)
+            stored = store.get(*keys[c], seed, k * chunk_size, count) if store is not None else None
+            chunk_totals[c].append(stored)
+            if stored is None:
+                tasks.append((trial, tuple(args), stream, count))
+                owners.append((c, k, count))
+
+    for (c, k, count), totals in zip(owners, iter_map(_run_chunk, tasks, workers)):
+        if store is not None:
+            store.add(*keys[c], seed, k * chunk_size, totals, count)
+        chunk_totals[c][k] = totals
+
+    results = [{} for _ in configs]
+    for c, chunks in enumerate(chunk_totals):
+        for totals in chunks:
+            merge_totals(results[c], totals)
+    return results
+
+
+def run_trials(trial, runs, args=(), seed=0, workers=1, chunk_size=CHUNK_SIZE, store=None, key=None):
+    return run_trial_grid(trial, [args], runs, seed, workers, chunk_size, store,
+                          [key] if key is not None else None)[0]
+
+
+def _run_chunk(trial, args, stream, count):
+    random.seed(int(stream.generate_state(1, dtype="uint64")[0]))
+    totals = {}
+    for _ in range(count):
+        result = trial(*args)
+        if result is not None:
+            merge_totals(totals, result)
+    return totals
@@ -0,0 +1,89 @@
+# Disjoint-set forest plus a threshold sweep over random edge insertions.
+from edge_sampling import random_edge_order
+
+
+class UnionFind:
+
+    def __init__(self, n):
+        self.parent = list(range(n))
+        self.size = [1] * n
+        self.components = n
+        self.largest = 1 if n else 0
+
+    def find(self, x):
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]  # path halving
+            x = parent[x]
+        return x
+
+    # Merges the sets holding a and b. Returns False if they were already
+    # together, i.e. the edge (a, b) closes a cycle.
+    def union(self, a, b):
+        a = self.find(a)
+        b = self.find(b)
+        if a == b:
+            return False
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        self.components -= 1
+        self.largest = max(self.largest, self.size[a])
+        return True
+
+
+def edge_thresholds(n, rng=None, limit=None):
+    # Inserts the edges of one random permutation of all pairs and returns
+    # (first_cycle, connected): the smallest edge counts at which the graph
+    # has a cycle / is connected. Since any prefix of the permutation is a
+    # uniform random graph with that many edges, one pass answers every edge
+    # count. Stops after limit edges; a threshold not reached is None.
+    uf = UnionFind(n)
+    first_cycle = None
+    connected = 0 if n <= 1 else None
+    edges = 0
+    for u, v in random_edge_order(n, rng):
+        if limit is not None and edges >= limit:
+            break
+        edges += 1
+        if not uf.union(u, v):
+            if first_cycle is None:
+                first_cycle = edges
+        elif uf.components == 1:
+            connected = edges
+        if first_cycle is not None and connected is not None:
+            break
+    return first_cycle, connected
+
+
+def sweep_snapshots(n, edge_values, rng=None):
+    # Inserts one random edge permutation and, for each edge count in
+    # edge_values (ascending), yields (components, largest component size)
+    # of the graph made of that many edges.
+    uf = UnionFind(n)
+    order = random_edge_order(n, rng)
+    edges = 0
+    for e in edge_values:
+        while edges < e:
+            pair = next(order, None)
+            if pair is None:
+                break
+            uf.union(*pair)
+            edges += 1
+        yield uf.components, uf.largest
+
+
+def threshold_probabilities(n, edge_values, trials, rng=None):
+    # P(cycle) and P(connected) for every edge count in edge_values, from one
+    # edge_thresholds sweep per trial
+    limit = max(edge_values, default=0)
+    cycle_at = []
+    connected_at = []
+    for _ in range(trials):
+        first_cycle, connected = edge_thresholds(n, rng, limit)
+        cycle_at.append(first_cycle)
+        connected_at.append(connected)
+    p_cycle = [sum(1 for t in cycle_at if t is not None and t <= e) / trials for e in edge_values]
+    p_connected = [sum(1 for t in connected_at if t is not None and t <= e) / trials for e in edge_values]
+    return p_cycle, p_connected
@@ -0,0 +1,211 @@
+# Exact minimum vertex cover by branch and bound on bitmask adjacency.
+#
+# adj is a list where adj[v] is the neighbour bitmask of node v and alive is
+# the bitmask of nodes still in the (sub)graph. Before branching every
+# subproblem is shrunk with the usual kernelization rules:
+#   - degree 0: the node is never needed
+#   - degree 1: take its neighbour
+#   - degree 2: if the two neighbours are adjacent take both, otherwise fold
+#     v, u, w into a single node (the cover shrinks by exactly one)
+#   - crown: an independent set I whose neighbourhood H can be matched into
+#     I, take H and drop I
+# and pruned with a maximal matching lower bound.
+
+import instrument
+from bitset import popcount, iter_bits
+
+
+def min_vertex_cover_mask(adj, alive=None):
+    adj = list(adj)
+    if alive is None:
+        alive = (1 << len(adj)) - 1
+
+    # a self loop can only be covered by its own endpoint
+    forced = 0
+    for v in iter_bits(alive):
+        if adj[v] >> v & 1:
+            forced |= 1 << v
+    alive &= ~forced
+
+    # alive itself is a cover, so a limit of |alive| + 1 always succeeds
+    return forced | _solve(adj, alive, popcount(alive) + 1)
+
+
+def _solve(adj, alive, limit):
+    # minimum cover of the subgraph on alive if it has fewer than limit
+    # nodes, otherwise None
+    instrument.count("vc_exact.search_nodes")
+    adj = list(adj)  # folding rewrites rows, keep the caller's intact
+    folds = []
+    alive, taken = _reduce(adj, alive, folds)
+    size = popcount(taken) + len(folds)
+    if size >= limit:
+        return None
+    if not alive:
+        return _unfold(taken, folds)
+
+    comp = _component(adj, alive)
+    if comp != alive:
+        comps = []
+        rest = alive
+        while rest:
+            c = _component(adj, rest)
+            comps.append(c)
+            rest &= ~c
+        bounds = [_matching_bound(adj, c) for c in comps]
+        rest_bound = sum(bounds)
+        cover = taken
+        for c, bound in zip(comps, bounds):
+            rest_bound -= bound
+            sub = _solve(adj, c, limit - size - rest_bound)
+            if sub is None:
+                return None
+            size += popcount(sub)
+            cover |= sub
+        return _unfold(cover, folds)
+
+    if size + _matching_bound(adj, alive) >= limit:
+        return None
+
+    # branch on a maximum degree node: either it is in the cover, or all of
+    # its neighbours are
+    v = max(iter_bits(alive), key=lambda x: popcount(adj[x] & alive))
+    bit = 1 << v
+    best = None
+    sub = _solve(adj, alive & ~bit, limit - size - 1)
+    if sub is not None:
+        best = sub | bit
+        limit = size + popcount(best)
+    nbrs = adj[v] & alive
+    sub = _solve(adj, alive & ~(nbrs | bit), limit - size - popcount(nbrs))
+    if sub is not None:
+        best = sub | nbrs
+    if best is None:
+        return None
+    return _unfold(taken | best, folds)
+
+
+def _reduce(adj, alive, folds):
+    taken = 0
+    changed = True
+    while changed:
+        changed = False
+        for v in iter_bits(alive):
+            if not alive >> v & 1:
+                continue
+            bit = 1 << v
+            nbrs = adj[v] & alive
+            if nbrs == 0:
+                alive &= ~bit
+                continue
+            rest = nbrs & (nbrs - 1)
+            if rest == 0:
+                # degree 1
+                taken |= nbrs
+                alive &= ~(nbrs | bit)
+                changed = True
+            elif rest & (rest - 1) == 0:
+                # degree 2
+                u = (nbrs & -nbrs).bit_length() - 1
+                w = rest.bit_length() - 1
+                if adj[u] >> w & 1:
+                    taken |= nbrs
+                    alive &= ~(nbrs | bit)
+                else:
+                    # v now stands for the merged node {u, v, w}
+                    merged = (adj[u] | adj[w]) & alive & ~(nbrs | bit)
+                    alive &= ~nbrs
+                    adj[v] = merged
+                    for x in iter_bits(merged):
+                        adj[x] |= bit
+                    folds.append((v, u, w))
+                changed = True
+        if not changed and alive:
+            crown = _crown(adj, alive)
+            if crown is not None:
+                independent, head = crown
+                taken |= head
+                alive &= ~(independent | head)
+                changed = True
+    return alive, taken
+
+
+def _unfold(cover, folds):
+    # undo degree-2 folds, most recent first
+    for v, u, w in reversed(folds):
+        if cover >> v & 1:
+            cover = cover & ~(1 << v) | (1 << u) | (1 << w)
+        else:
+            cover |= 1 << v
+    return cover
+
+
+def _component(adj, alive):
+    # nodes reachable from the lowest node of alive
+    seen = alive & -alive
+    frontier = seen
+    while frontier:
+        reach = 0
+        for v in iter_bits(frontier):
+            reach |= adj[v]
+        frontier = reach & alive & ~seen
+        seen |= frontier
+    return seen
+
+
+def _maximal_matching(adj, alive):
+    # returns (number of matched edges, unmatched nodes)
+    count = 0
+    free = alive
+    for v in iter_bits(alive):
+        if free >> v & 1:
+            nbrs = adj[v] & free & ~(1 << v)
+            if nbrs:
+                free &= ~((nbrs & -nbrs) | (1 << v))
+                count += 1
+    return count, free
+
+
+def _matching_bound(adj, alive):
+    # every matched edge needs its own cover node
+    return _maximal_matching(adj, alive)[0]
+
+
+def _crown(adj, alive):
+    # nodes missed by a maximal matching are independent; a maximum matching
+    # from them into their neighbourhood either finds a crown or proves
+    # there is none reachable from this matching
+    outsiders = _maximal_matching(adj, alive)[1]
+    if not outsiders:
+        return None
+
+    mate = {}
+    matched = 0
+    for o in iter_bits(outsiders):
+        if _augment(adj, alive, o, mate, [0]):
+            matched |= 1 << o
+    independent = outsiders & ~matched
+    if not independent:
+        return None
+
+    while True:
+        head = 0
+        for o in iter_bits(independent):
+            head |= adj[o] & alive
+        grown = independent
+        for h in iter_bits(head):
+            grown |= 1 << mate[h]
+        if grown == independent:
+            return independent, head
+        independent = grown
+
+
+def _augment(adj, alive, o, mate, seen):
+    # Kuhn's augmenting path search; seen is a one element list holding the
+    # bitmask of head nodes already tried in this search
+    for h in iter_bits(adj[o] & alive & ~seen[0]):
+        seen[0] |= 1 << h
+        if h not in mate or _augment(adj, alive, mate[h], mate, seen):
+            mate[h] = o
+            return True
+    return False